@@ -1,23 +1,31 @@
 # app/auth.py
 import os
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models import User
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 480  
 
+# last_login is only rewritten once it is this old, so bursts of logins
+# don't each cost a row update and WAL write
+LAST_LOGIN_RESOLUTION_MINUTES = 5
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -37,6 +45,32 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def update_last_login(user_id) -> None:
+    """
+    Stamp users.last_login outside the request path
+    
+    Meant to run as a BackgroundTask after the login response is sent,
+    so it opens its own session and issues a plain UPDATE. Skipped when
+    the stored value is within LAST_LOGIN_RESOLUTION_MINUTES.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("""
+                UPDATE users SET last_login = now()
+                WHERE id = :id
+                    AND (last_login IS NULL OR last_login < now() - make_interval(mins => :minutes))
+            """),
+            {"id": user_id, "minutes": LAST_LOGIN_RESOLUTION_MINUTES}
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to update last_login for user {user_id}: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
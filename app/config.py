@@ -6,3 +6,22 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 # REDIS_URL = os.getenv("REDIS_URL")
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE"))
 
+# Connection pool sizing. Every pool below counts against Postgres'
+# max_connections (100 by default); with the defaults one API instance opens
+# at most:
+#   sync engine   DB_POOL_SIZE + DB_MAX_OVERFLOW               = 10 + 10 = 20
+#   async engine  DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW   =  5 +  5 = 10
+#   upload processes (2, see app/tasks.py) x DB_UPLOAD_POOL_SIZE = 2 x 2 =  4
+#                                                                 total   34
+# The upload share assumes the entry point script does not import app.main at
+# module level (see app/upload_process.py); otherwise every upload process
+# also opens full-size pools.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "5"))
+# Upload processes parse one file at a time, so their sync pool is small and
+# has no overflow; their async engine is never used
+DB_UPLOAD_POOL_SIZE = int(os.getenv("DB_UPLOAD_POOL_SIZE", "2"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
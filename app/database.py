@@ -1,16 +1,74 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_ASYNC_POOL_SIZE,
+    DB_ASYNC_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE
+)
 
 
-engine = create_engine(DATABASE_URL)
+def _async_database_url(url: str) -> str:
+    """Same database URL, asyncpg driver"""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# Long-running summary/export requests hold a connection for seconds; size the
+# pools for that, drop connections the network silently killed (pre_ping) and
+# recycle them before idle timeouts on the way to the database. The two
+# engines split one connection budget (see app/config.py).
+POOL_OPTIONS = {
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": True
+}
+
+# Compiled SQL is cached per statement shape; the optional summary and
+# merged-data filters combine into many shapes, so keep more than the
+# default 500 to avoid evicting hot ones
+QUERY_CACHE_SIZE = 1200
+
+engine = create_engine(
+    DATABASE_URL,
+    query_cache_size=QUERY_CACHE_SIZE,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    **POOL_OPTIONS
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for read-heavy endpoints, so the event loop is free during SQL waits
+async_engine = create_async_engine(
+    _async_database_url(DATABASE_URL),
+    query_cache_size=QUERY_CACHE_SIZE,
+    pool_size=DB_ASYNC_POOL_SIZE,
+    max_overflow=DB_ASYNC_MAX_OVERFLOW,
+    **POOL_OPTIONS
+)
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
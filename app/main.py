@@ -10,6 +10,7 @@ import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy.orm import Session
+from sqlalchemy import text
 
 # Database and models
 from app.database import engine, SessionLocal
@@ -31,7 +32,17 @@ from app.routers import (
 )
 
 # Background task utilities
-from app.tasks import task_worker, task_queue, task_workers
+from app.tasks import (
+    task_worker,
+    task_queue,
+    task_workers,
+    export_worker,
+    export_queue,
+    export_workers,
+    process_pool,
+    wait_for_view_refresh
+)
+from app.summary_views import create_summary_views
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +54,29 @@ logger = logging.getLogger(__name__)
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
+# create_all skips tables that already exist, so add newer indexes one by one
+for index in (*models.PurchaseOrder.__table__.indexes, *models.Acceptance.__table__.indexes):
+    try:
+        index.create(bind=engine, checkfirst=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not create index {index.name}: {str(e)}")
+
+# Trigram indexes behind the PO and acceptance searches (need the pg_trgm extension)
+try:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(models.PO_SEARCH_INDEX_DDL)
+        for ddl in models.ACCEPTANCE_SEARCH_INDEX_DDLS:
+            conn.execute(ddl)
+except Exception as e:
+    logger.warning(f"⚠️ Search indexes not created, searches will scan: {str(e)}")
+
+# Precomputed period summaries read by the summary endpoints
+try:
+    create_summary_views()
+except Exception as e:
+    logger.error(f"❌ Summary views not created: {str(e)}")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="PO Management API",
@@ -100,7 +134,13 @@ async def health_check():
         "status": "healthy",
         "version": "1.0.0",
         "database": "connected",
-        "workers": len(task_workers)
+        "workers": len(task_workers),
+        "export_workers": len(export_workers),
+        "db_pool": {
+            "size": engine.pool.size(),
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow()
+        }
     }
 
 
@@ -117,6 +157,20 @@ app.include_router(gap_analysis.router)
 app.include_router(overview_charts.router)
 app.include_router(upload_history.router)  # ⭐ ADDED
 
+
+def _assert_unique_routes(application: FastAPI) -> None:
+    """Fail fast if a router is included twice or two handlers claim the same path and method"""
+    seen = set()
+    for route in application.routes:
+        for method in getattr(route, "methods", None) or ():
+            key = (route.path, method)
+            if key in seen:
+                raise RuntimeError(f"Duplicate route registered: {method} {route.path}")
+            seen.add(key)
+
+
+_assert_unique_routes(app)
+
 logger.info("✅ All routers registered successfully")
 
 
@@ -142,7 +196,11 @@ async def startup_event():
         task_workers.append(worker)
         logger.info(f"✅ Worker {i+1} started")
     
-    logger.info("🎉 PO Management API started successfully with 2 background workers")
+    # Exports have their own worker so they never queue ahead of uploads
+    export_workers.append(asyncio.create_task(export_worker()))
+    logger.info("✅ Export worker started")
+    
+    logger.info("🎉 PO Management API started successfully with 2 background workers and 1 export worker")
     logger.info("📚 API Documentation available at /docs")
 
 
@@ -155,6 +213,8 @@ async def shutdown_event():
     logger.info("⏳ Signaling workers to shutdown...")
     for _ in range(len(task_workers)):
         await task_queue.put(("shutdown", None))
+    for _ in range(len(export_workers)):
+        await export_queue.put(("shutdown", None))
     
     # Wait for all tasks to complete
     logger.info("⏳ Waiting for pending tasks to complete...")
@@ -165,12 +225,18 @@ async def shutdown_event():
     for worker in task_workers:
         worker.cancel()
     
-    # Wait for workers to finish
+    # Wait for workers to finish; the export worker exits once it has built
+    # the exports queued ahead of its shutdown signal
     await asyncio.gather(*task_workers, return_exceptions=True)
+    await asyncio.gather(*export_workers, return_exceptions=True)
+    
+    # Let a view refresh started by the last uploads complete
+    await wait_for_view_refresh()
     
-    # Shutdown thread pool
+    # Shutdown thread and process pools
     logger.info("⏳ Shutting down thread pool...")
     thread_pool.shutdown(wait=True)
+    process_pool.shutdown(wait=True)
     
     logger.info("✅ PO Management API shutdown complete")
 
@@ -6,7 +6,8 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.schema import DDL
+from sqlalchemy.sql import func, literal_column
 import uuid
 from app.database import Base
 
@@ -124,9 +125,38 @@ class PurchaseOrder(Base):
         Index('idx_user_po_lookup', 'user_id', 'po_number', 'po_line_no'),
         Index('idx_user_po_status', 'user_id', 'po_status'),
         Index('idx_user_project', 'user_id', 'project_code'),
+        # Matches the merged-data listing order (po_no DESC, po_line ASC)
+        Index(
+            'idx_user_po_order', 'user_id', po_number.desc(), 'po_line_no',
+            postgresql_include=['project_name', 'po_status']
+        ),
     )
 
 
+# PO number + item description as one searchable string. The search filters
+# must use this exact expression for the trigram index below to apply.
+PO_SEARCH_TEXT = PurchaseOrder.po_number.concat(literal_column("' '")).concat(
+    func.coalesce(PurchaseOrder.item_description, literal_column("''"))
+)
+
+# Trigram index serving ILIKE '%...%' on PO_SEARCH_TEXT. Created at startup
+# rather than by create_all because it depends on the pg_trgm extension.
+PO_SEARCH_INDEX_DDL = DDL(
+    "CREATE INDEX IF NOT EXISTS idx_po_search_trgm ON purchase_orders "
+    "USING gin ((po_number || ' ' || COALESCE(item_description, '')) gin_trgm_ops)"
+)
+
+# Trigram indexes serving the acceptance listing's ILIKE '%...%' filters
+# (project_name, and the search over acceptance_no OR po_number)
+ACCEPTANCE_SEARCH_INDEX_DDLS = tuple(
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS idx_acceptance_{column}_trgm ON acceptances "
+        f"USING gin ({column} gin_trgm_ops)"
+    )
+    for column in ("project_name", "acceptance_no", "po_number")
+)
+
+
 
 class POStaging(Base):
     __tablename__ = "po_staging"
@@ -345,6 +375,8 @@ class Acceptance(Base):
         Index('idx_user_acceptance_lookup', 'user_id', 'acceptance_no', 'po_number', 'po_line_no', 'shipment_no'),
         Index('idx_user_acceptance_status', 'user_id', 'record_status'),
         Index('idx_user_acceptance_project', 'user_id', 'project_code'),
+        # PO line lookups (merged-data join, matching PO count)
+        Index('idx_user_acceptance_po_line', 'user_id', 'po_number', 'po_line_no'),
     )
 
 
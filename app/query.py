@@ -1,19 +1,46 @@
-MERGED_DATA_QUERY = """
+from functools import lru_cache
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+# Computed columns of MERGED_DATA_QUERY, kept separate so filters can use the
+# same expression in the inner WHERE instead of wrapping the whole query
+MERGED_CATEGORY_SQL = """CASE
+        WHEN po.item_description ILIKE '%Survey%' THEN 'Survey'
+        WHEN po.item_description ILIKE '%Transportation%' THEN 'Transportation'
+        WHEN po.item_description ILIKE '%Work Order%' AND po.site_name ILIKE '%Non DU%' THEN 'Site Engineer'
+        WHEN po.item_description ILIKE '%Work Order%' THEN 'Service'
+        ELSE 'Service'
+    END"""
+
+MERGED_STATUS_SQL = """CASE
+        WHEN po.payment_terms::text LIKE '%COD%' OR (po.payment_terms::text LIKE '%AC1%' AND po.payment_terms::text NOT LIKE '%AC2%') THEN
+        CASE
+            WHEN po.requested_qty = 0 THEN 'CANCELLED'
+            WHEN a.ac_date IS NOT NULL THEN 'CLOSED'
+            WHEN a.ac_date IS NULL THEN 'Pending ACPAC'
+            ELSE 'CLOSED'
+        END
+        WHEN po.payment_terms::text LIKE '%AC1%' AND po.payment_terms::text LIKE '%AC2%' THEN
+        CASE
+            WHEN po.po_status::text = 'CANCELLED' THEN 'CANCELLED'
+            WHEN po.po_status::text = 'CLOSED' THEN 'CLOSED'
+            WHEN a.ac_date IS NULL THEN 'Pending AC80%'
+            WHEN a.pac_date IS NULL THEN 'Pending PAC20%'
+            ELSE 'CLOSED'
+        END
+        ELSE 'Unknown'
+    END"""
+
+MERGED_DATA_QUERY = f"""
 SELECT 
-    po.user_id,
     concat(po.po_number, '-', po.po_line_no) AS po_id,
     acc.account_name,
     po.project_name,
     po.site_code,
     po.po_number AS po_no,
     po.po_line_no AS po_line,
-    CASE
-        WHEN po.item_description ILIKE '%Survey%' THEN 'Survey'
-        WHEN po.item_description ILIKE '%Transportation%' THEN 'Transportation'
-        WHEN po.item_description ILIKE '%Work Order%' AND po.site_name ILIKE '%Non DU%' THEN 'Site Engineer'
-        WHEN po.item_description ILIKE '%Work Order%' THEN 'Service'
-        ELSE 'Service'
-    END AS category,
+    {MERGED_CATEGORY_SQL} AS category,
     po.item_description AS item_desc,
     CASE
         WHEN po.payment_terms::text LIKE '%COD%' THEN 'ACPAC 100%'
@@ -32,24 +59,7 @@ SELECT
         WHEN (po.payment_terms::text LIKE '%COD%' OR (po.payment_terms::text LIKE '%AC1%' AND po.payment_terms::text NOT LIKE '%AC2%')) AND a.ac_date IS NOT NULL THEN a.ac_date
         ELSE a.pac_date
     END AS pac_date,
-    CASE
-        WHEN po.payment_terms::text LIKE '%COD%' OR (po.payment_terms::text LIKE '%AC1%' AND po.payment_terms::text NOT LIKE '%AC2%') THEN
-        CASE
-            WHEN po.requested_qty = 0 THEN 'CANCELLED'
-            WHEN a.ac_date IS NOT NULL THEN 'CLOSED'
-            WHEN a.ac_date IS NULL THEN 'Pending ACPAC'
-            ELSE 'CLOSED'
-        END
-        WHEN po.payment_terms::text LIKE '%AC1%' AND po.payment_terms::text LIKE '%AC2%' THEN
-        CASE
-            WHEN po.po_status::text = 'CANCELLED' THEN 'CANCELLED'
-            WHEN po.po_status::text = 'CLOSED' THEN 'CLOSED'
-            WHEN a.ac_date IS NULL THEN 'Pending AC80%'
-            WHEN a.pac_date IS NULL THEN 'Pending PAC20%'
-            ELSE 'CLOSED'
-        END
-        ELSE 'Unknown'
-    END AS status,
+    {MERGED_STATUS_SQL} AS status,
     CASE
         WHEN po.payment_terms::text LIKE '%COD%' OR (po.payment_terms::text LIKE '%AC1%' AND po.payment_terms::text NOT LIKE '%AC2%') THEN
         CASE
@@ -80,5 +90,19 @@ LEFT JOIN (
     GROUP BY acceptances.user_id, acceptances.po_number, acceptances.po_line_no
 ) a ON po.user_id = a.user_id AND po.po_number::text = a.po_number::text AND po.po_line_no::text = a.po_line_no::text
 LEFT JOIN accounts acc ON po.user_id = acc.user_id AND po.project_name::text = acc.project_name::text
-WHERE {base_filter}
-"""
\ No newline at end of file
+WHERE {{base_filter}}
+"""
+
+
+@lru_cache(maxsize=256)
+def cached_statement(sql: str) -> TextClause:
+    """
+    text() clause for a query built on MERGED_DATA_QUERY, once per distinct SQL string
+    
+    Filters are bind parameters (po.user_id = :user_id, ...), so the SQL only
+    varies with which optional filters are present and the same strings come
+    back request after request. Reusing the clause skips re-parsing its bind
+    parameters, and its compiled form is then found in the engine's compiled
+    cache.
+    """
+    return text(sql)
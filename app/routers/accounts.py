@@ -5,6 +5,8 @@ from app.database import get_db
 from app.auth import get_current_user
 from app.models import User
 from app import models
+from app.utils.response_cache import bump_data_version
+from app.tasks import request_view_refresh
 
 router = APIRouter(prefix="/api/accounts", tags=["accounts"])
 
@@ -79,5 +81,10 @@ async def update_account(
     db.commit()
     db.refresh(account)
     
+    # Account names feed the merged view and the cached dashboard payloads;
+    # the view is rebuilt in the background and caches are dropped again after
+    bump_data_version(current_user.id)
+    request_view_refresh(current_user.id, summaries=False)
+    
     return account
 
@@ -1,10 +1,12 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional
 from datetime import timedelta, datetime
+import hmac
 import logging
 import re
 from app.services.password_reset_service import PasswordResetService
@@ -16,6 +18,7 @@ from app.auth import (
     verify_password, 
     create_access_token,
     get_current_user,
+    update_last_login,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
@@ -24,6 +27,27 @@ logger = logging.getLogger(__name__)
 # FIXED: Changed prefix to match OAuth2 tokenUrl
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
+# ==================== Password Rules ====================
+
+# Compiled once at import; checked in order so the first failing rule wins
+_PASSWORD_RULES = (
+    (re.compile(r'[A-Z]'), 'Password must contain at least one uppercase letter'),
+    (re.compile(r'[a-z]'), 'Password must contain at least one lowercase letter'),
+    (re.compile(r'\d'), 'Password must contain at least one digit'),
+    (re.compile(r'[!@#$%^&*(),.?":{}|<>]'), 'Password must contain at least one special character'),
+)
+
+
+def _validate_password_strength(v: str) -> str:
+    """Shared strength check for every schema that accepts a new password"""
+    if len(v) < 8:
+        raise ValueError('Password must be at least 8 characters long')
+    for pattern, message in _PASSWORD_RULES:
+        if not pattern.search(v):
+            raise ValueError(message)
+    return v
+
+
 # ==================== Pydantic Schemas ====================
 
 class UserRegistration(BaseModel):
@@ -44,17 +68,7 @@ class UserRegistration(BaseModel):
         - At least one digit
         - At least one special character
         """
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not re.search(r'\d', v):
-            raise ValueError('Password must contain at least one digit')
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', v):
-            raise ValueError('Password must contain at least one special character')
-        return v
+        return _validate_password_strength(v)
     
     @validator('email')
     def validate_email(cls, v):
@@ -85,17 +99,7 @@ class ResetPasswordRequest(BaseModel):
     
     @validator('new_password')
     def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not re.search(r'\d', v):
-            raise ValueError('Password must contain at least one digit')
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', v):
-            raise ValueError('Password must contain at least one special character')
-        return v
+        return _validate_password_strength(v)
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -142,17 +146,7 @@ class PasswordChange(BaseModel):
     @validator('new_password')
     def validate_password(cls, v):
         """Same validation as registration"""
-        if len(v) < 8:
-            raise ValueError('Password must be at least 8 characters long')
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not re.search(r'\d', v):
-            raise ValueError('Password must contain at least one digit')
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', v):
-            raise ValueError('Password must contain at least one special character')
-        return v
+        return _validate_password_strength(v)
 
 
 class PasswordResetRequest(BaseModel):
@@ -203,16 +197,18 @@ async def register(
                 detail="Email already registered. Please use a different email or login."
             )
         
-        # Create new user
+        # Create new user (bcrypt is CPU-bound, so hash off the event loop)
+        password_hash = await run_in_threadpool(get_password_hash, user_data.password)
         new_user = User(
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=password_hash,
             prenom=user_data.prenom,
             nom=user_data.nom,
             company_name=user_data.company_name,
             company_logo=user_data.company_logo,
             is_active=True,
-            email_verified=False 
+            email_verified=False,
+            last_login=datetime.utcnow()
         )
         
         db.add(new_user)
@@ -228,10 +224,6 @@ async def register(
             expires_delta=access_token_expires
         )
         
-        # Update last login
-        new_user.last_login = datetime.utcnow()
-        db.commit()
-        
         return TokenResponse(
             access_token=access_token,
             token_type="bearer",
@@ -253,9 +245,74 @@ async def register(
         )
 
 
+def _authenticate_and_issue_token(
+    email: str,
+    password: str,
+    db: Session,
+    background_tasks: BackgroundTasks
+) -> TokenResponse:
+    """
+    Shared credential check and token issuing for /login and /token
+    
+    Blocking (DB lookup plus a ~250ms bcrypt verify), so the endpoints run
+    it in the threadpool rather than on the event loop.
+    
+    Raises:
+        HTTPException: 401 on bad credentials, 403 on a deactivated account
+    """
+    # Find user by email (only the columns the response needs)
+    user = db.query(
+        User.id,
+        User.email,
+        User.password_hash,
+        User.is_active,
+        User.prenom,
+        User.nom,
+        User.company_name
+    ).filter(User.email == email.lower()).first()
+    
+    # Verify password
+    if not user or not verify_password(password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Check if account is active
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is deactivated. Please contact support."
+        )
+    
+    # Generate JWT token
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.email},
+        expires_delta=access_token_expires
+    )
+    
+    # Update last login after the response is sent
+    background_tasks.add_task(update_last_login, user.id)
+    
+    logger.info(f"✅ User logged in: {user.email}")
+    
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        user_id=str(user.id),
+        email=user.email,
+        name=f"{user.prenom} {user.nom}",
+        company_name=user.company_name
+    )
+
+
 @router.post("/login", response_model=TokenResponse)
 async def login(
     user_credentials: UserLogin,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -274,52 +331,12 @@ async def login(
     ```
     """
     try:
-        # Find user by email
-        user = db.query(User).filter(User.email == user_credentials.email.lower()).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Verify password
-        if not verify_password(user_credentials.password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Check if account is active
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Account is deactivated. Please contact support."
-            )
-        
-        # Generate JWT token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email},
-            expires_delta=access_token_expires
-        )
-        
-        # Update last login
-        user.last_login = datetime.utcnow()
-        db.commit()
-        
-        logger.info(f"✅ User logged in: {user.email}")
-        
-        return TokenResponse(
-            access_token=access_token,
-            token_type="bearer",
-            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            user_id=str(user.id),
-            email=user.email,
-            name=f"{user.prenom} {user.nom}",
-            company_name=user.company_name
+        return await run_in_threadpool(
+            _authenticate_and_issue_token,
+            user_credentials.email,
+            user_credentials.password,
+            db,
+            background_tasks
         )
         
     except HTTPException:
@@ -334,6 +351,7 @@ async def login(
 
 @router.post("/token", response_model=TokenResponse)
 async def login_for_swagger(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -347,38 +365,12 @@ async def login_for_swagger(
     - `password`: Your password
     """
     try:
-        user = db.query(User).filter(User.email == form_data.username.lower()).first()
-        
-        if not user or not verify_password(form_data.password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Account is deactivated"
-            )
-        
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email},
-            expires_delta=access_token_expires
-        )
-        
-        user.last_login = datetime.utcnow()
-        db.commit()
-        
-        return TokenResponse(
-            access_token=access_token,
-            token_type="bearer",
-            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            user_id=str(user.id),
-            email=user.email,
-            name=f"{user.prenom} {user.nom}",
-            company_name=user.company_name
+        return await run_in_threadpool(
+            _authenticate_and_issue_token,
+            form_data.username,
+            form_data.password,
+            db,
+            background_tasks
         )
         
     except HTTPException:
@@ -439,22 +431,25 @@ async def change_password(
     ```
     """
     try:
-        # Verify old password
-        if not verify_password(password_data.old_password, current_user.password_hash):
+        # Check new password is different (cheap, so before bcrypt)
+        if hmac.compare_digest(
+            password_data.old_password.encode("utf-8"),
+            password_data.new_password.encode("utf-8")
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Current password is incorrect"
+                detail="New password must be different from current password"
             )
         
-        # Check new password is different
-        if password_data.old_password == password_data.new_password:
+        # Verify old password
+        if not await run_in_threadpool(verify_password, password_data.old_password, current_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="New password must be different from current password"
+                detail="Current password is incorrect"
             )
         
         # Update password
-        current_user.password_hash = get_password_hash(password_data.new_password)
+        current_user.password_hash = await run_in_threadpool(get_password_hash, password_data.new_password)
         current_user.updated_at = datetime.utcnow()
         db.commit()
         
@@ -515,11 +510,12 @@ async def validate_token(current_user: User = Depends(get_current_user)):
 @router.post("/forgot-password", response_model=MessageResponse)
 async def forgot_password(
     request: ForgotPasswordRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Request password reset email"""
+    """Request password reset email (sent after the response)"""
     password_reset_service = PasswordResetService(db)
-    success, message = password_reset_service.create_reset_token(request.email)
+    success, message = password_reset_service.create_reset_token(request.email, background_tasks)
     return MessageResponse(message=message)
 
 
@@ -541,13 +537,15 @@ async def verify_reset_token(
 @router.post("/reset-password", response_model=MessageResponse)
 async def reset_password(
     request: ResetPasswordRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Reset password using a valid reset token"""
     password_reset_service = PasswordResetService(db)
     success, message = password_reset_service.reset_password(
         request.token,
-        request.new_password
+        request.new_password,
+        background_tasks
     )
     
     if success:
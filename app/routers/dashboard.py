@@ -1,45 +1,81 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
 from app.auth import get_current_user
 from app.models import User
 from app.services.dashboard_service import DashboardService
+from app.utils.response_cache import TTLCache, cached_json_response, get_data_version
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
+# Dashboard aggregates only change on upload, which bumps the user's data version
+DASHBOARD_TTL_SECONDS = 120
+
+# Analytics payloads per (user, data version); /charts-data is built from the
+# same payload, so a page load hitting both endpoints runs the query once
+_analytics_cache = TTLCache()
+
+
+def _get_dashboard_analytics(db: Session, user_id: str):
+    """Dashboard analytics of a user, computed at most once per data version and TTL"""
+    key = (user_id, get_data_version(user_id))
+    analytics = _analytics_cache.get(key)
+    if analytics is None:
+        analytics = DashboardService.get_dashboard_analytics(db, user_id)
+        _analytics_cache.set(key, analytics, DASHBOARD_TTL_SECONDS)
+    return analytics
+
 
 @router.get("/data-status")
 async def get_data_status(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Check if both PO and Acceptance data exist"""
-    dashboard_service = DashboardService(db)
+    """Check if both PO and Acceptance data exist (cached per user for 2 minutes)"""
     user_id = str(current_user.id)
     
-    return dashboard_service.get_data_status(user_id)
+    return await cached_json_response(
+        request,
+        user_id,
+        lambda: run_in_threadpool(DashboardService.get_data_status, db, user_id),
+        ttl=DASHBOARD_TTL_SECONDS
+    )
 
 
 @router.get("/dashboard-analytics")
 async def get_dashboard_analytics(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get comprehensive dashboard analytics"""
-    dashboard_service = DashboardService(db)
+    """Get comprehensive dashboard analytics (cached per user for 2 minutes)"""
     user_id = str(current_user.id)
     
-    return dashboard_service.get_dashboard_analytics(user_id)
+    return await cached_json_response(
+        request,
+        user_id,
+        lambda: run_in_threadpool(_get_dashboard_analytics, db, user_id),
+        ttl=DASHBOARD_TTL_SECONDS
+    )
 
 
 @router.get("/charts-data")
 async def get_charts_data(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get structured data for React charts"""
-    dashboard_service = DashboardService(db)
+    """Get structured data for React charts (cached per user for 2 minutes)"""
     user_id = str(current_user.id)
     
-    return dashboard_service.get_charts_data(user_id)
\ No newline at end of file
+    return await cached_json_response(
+        request,
+        user_id,
+        lambda: run_in_threadpool(
+            lambda: DashboardService.get_charts_data(_get_dashboard_analytics(db, user_id))
+        ),
+        ttl=DASHBOARD_TTL_SECONDS
+    )
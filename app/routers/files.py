@@ -1,9 +1,7 @@
 # app/routers/files.py
 from fastapi import APIRouter, Depends, File, UploadFile
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.auth import get_current_user
 from app.models import User
 from app.services.file_service import FileService
@@ -14,15 +12,13 @@ router = APIRouter(prefix="/api", tags=["files"])
 @router.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Upload PO file for processing"""
-    file_service = FileService(db)
     user_id = str(current_user.id)
     
-    file_service.validate_file(file)
-    file_path = await file_service.save_temp_file(file)
+    file_extension = FileService.validate_file(file)
+    file_path = await FileService.save_temp_file(file, file_extension)
     
     # Pass filename to task queue (3 parameters now)
     await task_queue.put(("po_process", (file_path, user_id, file.filename)))
@@ -32,22 +28,20 @@ async def upload_file(
         content={
             "message": "File upload accepted. Processing has started.",
             "user_id": user_id,
-            "file_info": file_service.get_file_info(file)
+            "file_info": FileService.get_file_info(file, file_extension)
         }
     )
 
 @router.post("/upload-acceptance")
 async def upload_acceptance_file(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Upload Acceptance file for processing"""
-    file_service = FileService(db)
     user_id = str(current_user.id)
     
-    file_service.validate_file(file)
-    file_path = await file_service.save_temp_file(file)
+    file_extension = FileService.validate_file(file)
+    file_path = await FileService.save_temp_file(file, file_extension)
     
     # Pass filename to task queue (3 parameters now)
     await task_queue.put(("acceptance_process", (file_path, user_id, file.filename)))
@@ -57,6 +51,6 @@ async def upload_acceptance_file(
         content={
             "message": "Acceptance file upload accepted. Processing started.",
             "user_id": user_id,
-            "file_info": file_service.get_file_info(file)
+            "file_info": FileService.get_file_info(file, file_extension)
         }
     )
\ No newline at end of file
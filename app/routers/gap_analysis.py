@@ -1,24 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.auth import get_current_user
 from app.models import User
 from app.services.gap_analysis_service import GapAnalysisService
 from io import BytesIO
 import logging
+import re
 from app.services.gap_aging_service import GapAgingService
+from app.utils.response_cache import TTLCache, cached_json_response, get_data_version
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/gap-analysis", tags=["gap-analysis"])
 
+# Aging inputs only change on upload or account edits, which bump the user's data version
+AGING_TTL_SECONDS = 180
+
+# Aging workbooks per (user, data version, filters)
+_aging_excel_cache = TTLCache()
+
+# Anything other than letters, digits, spaces, '-' and '_' is dropped from filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w -]+")
+
+
+def _safe_name(value: str) -> str:
+    """Strip characters that are unsafe in a download filename"""
+    return _UNSAFE_FILENAME_CHARS.sub("", value).strip()
+
 @router.get("/financial-summary")
 async def get_gap_financial_summary(
+    request: Request,
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get gap financial analysis summary by project in tabular format
@@ -29,26 +48,33 @@ async def get_gap_financial_summary(
     - GAP AC OK; PAC NOK (PAC pending amounts)
     - Total GAP AC & PAC (combined gap amounts)
     - Gap Percentage by Project
+    
+    Cached per user and project filter for 60 seconds.
     """
     try:
-        service = GapAnalysisService(db)
-        financial_summary = service.get_gap_financial_summary_by_project(str(current_user.id), project_name)
+        user_id = str(current_user.id)
         
-        return {
-            "success": True,
-            "data": {
-                "financial_summary": financial_summary,
-                "column_headers": [
-                    "Project Name",
-                    "Total PO Received", 
-                    "GAP PO OK; AC NOK",
-                    "GAP AC OK; PAC NOK", 
-                    "Total GAP AC & PAC",
-                    "Gap Percentage",
-                    "Completion Percentage"
-                ]
+        async def build_summary():
+            financial_summary = await db.run_sync(
+                GapAnalysisService.get_gap_financial_summary_by_project, user_id, project_name
+            )
+            return {
+                "success": True,
+                "data": {
+                    "financial_summary": financial_summary,
+                    "column_headers": [
+                        "Project Name",
+                        "Total PO Received", 
+                        "GAP PO OK; AC NOK",
+                        "GAP AC OK; PAC NOK", 
+                        "Total GAP AC & PAC",
+                        "Gap Percentage",
+                        "Completion Percentage"
+                    ]
+                }
             }
-        }
+        
+        return await cached_json_response(request, user_id, build_summary, ttl=60)
         
     except Exception as e:
         logger.error(f"Error in gap financial summary endpoint: {str(e)}")
@@ -76,14 +102,15 @@ async def export_gap_financial_summary_excel(
     This endpoint is optimized for speed by calculating summaries directly in SQL.
     """
     try:
-        service = GapAnalysisService(db)
-        excel_data = service.export_gap_financial_summary_to_excel(str(current_user.id), project_name)
+        # Workbook building is CPU-bound; keep it off the event loop
+        excel_data = await run_in_threadpool(
+            GapAnalysisService.export_gap_financial_summary_to_excel, db, str(current_user.id), project_name
+        )
         
         # Create filename
         filename = "gap_financial_summary"
         if project_name:
-            safe_project_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).strip()
-            filename += f"_{safe_project_name}"
+            filename += f"_{_safe_name(project_name)}"
         filename += ".xlsx"
         
         # Return as streaming response
@@ -99,6 +126,7 @@ async def export_gap_financial_summary_excel(
 
 @router.get("/aging")
 async def get_aging_analysis(
+    request: Request,
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     account_name: Optional[str] = Query(None, description="Filter by account name"),
     category: Optional[str] = Query(None, description="Filter by category (Survey, Transportation, Site Engineer, Service)"),
@@ -123,17 +151,23 @@ async def get_aging_analysis(
     - Average age per bucket
     
     All filters are optional and can be combined.
+    Cached per user and filters for 3 minutes.
     """
     try:
-        service = GapAgingService(db)
-        aging_analysis = service.get_aging_analysis(
-            user_id=str(current_user.id),
-            project_name=project_name,
-            account_name=account_name,
-            category=category
-        )
+        user_id = str(current_user.id)
         
-        return aging_analysis
+        return await cached_json_response(
+            request,
+            user_id,
+            lambda: run_in_threadpool(
+                GapAgingService(db).get_aging_analysis,
+                user_id=user_id,
+                project_name=project_name,
+                account_name=account_name,
+                category=category
+            ),
+            ttl=AGING_TTL_SECONDS
+        )
         
     except Exception as e:
         logger.error(f"Error in aging analysis endpoint: {str(e)}")
@@ -161,26 +195,32 @@ async def export_aging_analysis_excel(
     - 31-60 days: Yellow (needs attention)
     - 61-90 days: Orange (urgent)
     - 90+ days: Red (critical)
+    
+    Workbooks are cached per user and filters for 3 minutes.
     """
     try:
-        service = GapAgingService(db)
-        excel_data = service.export_aging_analysis_to_excel(
-            user_id=str(current_user.id),
-            project_name=project_name,
-            account_name=account_name,
-            category=category
-        )
+        user_id = str(current_user.id)
+        cache_key = (user_id, get_data_version(user_id), project_name, account_name, category)
+        excel_data = _aging_excel_cache.get(cache_key)
+        if excel_data is None:
+            # Workbook building is CPU-bound; keep it off the event loop
+            excel_data = await run_in_threadpool(
+                GapAgingService(db).export_aging_analysis_to_excel,
+                user_id=user_id,
+                project_name=project_name,
+                account_name=account_name,
+                category=category
+            )
+            _aging_excel_cache.set(cache_key, excel_data, AGING_TTL_SECONDS)
         
         # Create filename
         filename = "gap_aging_analysis"
         if project_name:
-            safe_project_name = "".join(c for c in project_name if c.isalnum() or c in (' ', '-', '_')).strip()
-            filename += f"_{safe_project_name}"
+            filename += f"_{_safe_name(project_name)}"
         if account_name:
-            safe_account_name = "".join(c for c in account_name if c.isalnum() or c in (' ', '-', '_')).strip()
-            filename += f"_{safe_account_name}"
+            filename += f"_{_safe_name(account_name)}"
         if category:
-            filename += f"_{category}"
+            filename += f"_{_safe_name(category)}"
         filename += ".xlsx"
         
         # Return as streaming response
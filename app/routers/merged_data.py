@@ -1,24 +1,184 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import Optional
-from io import BytesIO
-import pandas as pd
+from sqlalchemy.sql.elements import TextClause
+from typing import Any, Dict, Optional, Tuple
+from functools import lru_cache
+from itertools import chain
 import logging
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.auth import get_current_user
 from app.models import User
-from app.query import MERGED_DATA_QUERY
+from app.query import MERGED_DATA_QUERY, MERGED_CATEGORY_SQL, MERGED_STATUS_SQL, cached_statement
+from app.utils.fast_json import FastJSONResponse
+from app.utils.fast_csv import iter_csv
+from app.utils.fast_xlsx import iter_xlsx
+from app.utils.response_cache import data_etag, etag_matches
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/merged-data", tags=["merged-data"])
 
+# Rows fetched per round-trip from the server-side cursor during export
+EXPORT_CHUNK_SIZE = 10_000
+
+EXPORT_COLUMNS = [
+    'PO ID', 'PO Number', 'PO Line', 'Account', 'Project', 'Site Code',
+    'Category', 'Item Description', 'Payment Terms', 'Unit Price',
+    'Requested Qty', 'Line Amount', 'Publish Date', 'AC Amount', 'AC Date',
+    'PAC Amount', 'PAC Date', 'Status', 'Remaining Amount'
+]
+
+# Export rows come back from SQL exactly as written to the file: one column
+# per EXPORT_COLUMNS entry, null amounts as 0. Dates are Excel serial day
+# numbers for xlsx and ISO 'YYYY-MM-DD' text for csv.
+_EXPORT_QUERY_TEMPLATE = """
+SELECT
+    po_id, po_no, po_line, account_name, project_name, site_code, category,
+    item_desc, payment_terms,
+    COALESCE(unit_price, 0),
+    req_qty,
+    COALESCE(line_amount, 0),
+    {publish_date},
+    COALESCE(ac_amount, 0),
+    {ac_date},
+    COALESCE(pac_amount, 0),
+    {pac_date},
+    status,
+    COALESCE(remaining, 0)
+FROM ({{base_query}}) AS export_rows
+ORDER BY po_no, po_line
+"""
+
+EXPORT_QUERY = _EXPORT_QUERY_TEMPLATE.format(
+    publish_date="publish_date::date - DATE '1899-12-30'",
+    ac_date="ac_date::date - DATE '1899-12-30'",
+    pac_date="pac_date::date - DATE '1899-12-30'"
+)
+
+EXPORT_CSV_QUERY = _EXPORT_QUERY_TEMPLATE.format(
+    publish_date="publish_date::date::text",
+    ac_date="ac_date::date::text",
+    pac_date="pac_date::date::text"
+)
+
+# Positions of 'Publish Date', 'AC Date' and 'PAC Date' in EXPORT_COLUMNS
+EXPORT_DATE_COLUMNS = (12, 14, 16)
+
+
+@lru_cache(maxsize=64)
+def _merged_query_sql(
+    has_status: bool,
+    has_category: bool,
+    has_project: bool,
+    has_account: bool,
+    has_site: bool,
+    has_search: bool
+) -> str:
+    """SQL text for one combination of active filters; values are always bound"""
+    filter_conditions = ["po.user_id = :user_id"]
+    if has_project:
+        filter_conditions.append("po.project_name ILIKE :project_name")
+    if has_search:
+        # Same expression as the idx_po_search_trgm index
+        filter_conditions.append("(po.po_number || ' ' || COALESCE(po.item_description, '')) ILIKE :search")
+    
+    # Computed columns are filtered with their own expressions in the inner
+    # WHERE, so no wrapping subquery is needed
+    if has_status:
+        filter_conditions.append(f"{MERGED_STATUS_SQL} = :status")
+    if has_category:
+        filter_conditions.append(f"{MERGED_CATEGORY_SQL} = :category")
+    if has_account:
+        filter_conditions.append("acc.account_name ILIKE :account_name")
+    if has_site:
+        filter_conditions.append("po.site_code ILIKE :site_code")
+    
+    return MERGED_DATA_QUERY.format(base_filter=" AND ".join(filter_conditions))
+
+
+def _merged_params(
+    user_id: str,
+    status: Optional[str],
+    category: Optional[str],
+    project_name: Optional[str],
+    account_name: Optional[str],
+    site_code: Optional[str],
+    search: Optional[str]
+) -> Tuple[Tuple[bool, ...], Dict[str, Any]]:
+    """Which filters are active (in _merged_query_sql argument order) and their bind parameters"""
+    params: Dict[str, Any] = {"user_id": user_id}
+    if status:
+        params["status"] = status
+    if category:
+        params["category"] = category
+    if project_name:
+        params["project_name"] = f"%{project_name}%"
+    if account_name:
+        params["account_name"] = f"%{account_name}%"
+    if site_code:
+        params["site_code"] = f"%{site_code}%"
+    if search:
+        params["search"] = f"%{search}%"
+    
+    flags = (
+        bool(status), bool(category), bool(project_name),
+        bool(account_name), bool(site_code), bool(search)
+    )
+    return flags, params
+
+
+def _build_merged_query(
+    user_id: str,
+    status: Optional[str],
+    category: Optional[str],
+    project_name: Optional[str],
+    account_name: Optional[str],
+    site_code: Optional[str],
+    search: Optional[str]
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Filtered merged-data SQL and its bind parameters
+    
+    The SQL only depends on which filters are set, so identical filter
+    combinations reuse the same statement text (and the same cached plan).
+    """
+    flags, params = _merged_params(
+        user_id, status, category, project_name, account_name, site_code, search
+    )
+    return _merged_query_sql(*flags), params
+
+
+@lru_cache(maxsize=128)
+def _merged_list_statements(flags: Tuple[bool, ...], use_cursor: bool) -> Tuple[TextClause, TextClause]:
+    """
+    Prepared (count, page) statements for the list endpoint
+    
+    Built once per filter combination, so the common unfiltered request
+    skips all SQL string formatting and text() parsing.
+    """
+    base_query = _merged_query_sql(*flags)
+    count_query = text(f"SELECT COUNT(*) as total FROM ({base_query}) as count_subquery")
+    
+    # Keyset condition matching ORDER BY po_no DESC, po_line ASC
+    if use_cursor:
+        base_query = (
+            f"SELECT * FROM ({base_query}) as page_subquery "
+            "WHERE (po_no < :after_po_no OR (po_no = :after_po_no AND po_line > :after_po_line))"
+        )
+    
+    # Fetch one extra row to know whether another page exists
+    data_query = text(f"{base_query} ORDER BY po_no DESC, po_line ASC LIMIT :limit OFFSET :offset")
+    return count_query, data_query
+
 
 @router.get("")
 async def get_merged_data(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(50, ge=1, le=1000, description="Items per page (max 1000)"),
     status: Optional[str] = Query(None, description="Filter by status"),
@@ -27,83 +187,95 @@ async def get_merged_data(
     account_name: Optional[str] = Query(None, description="Filter by account name"),
     site_code: Optional[str] = Query(None, description="Filter by site code"),
     search: Optional[str] = Query(None, description="Search in PO number or item description"),
-    db: Session = Depends(get_db),
+    after_po_no: Optional[str] = Query(None, description="Cursor: PO number of the last row already seen"),
+    after_po_line: Optional[str] = Query(None, description="Cursor: PO line of the last row already seen"),
+    include_total: bool = Query(True, description="Run the COUNT query for total_count/total_pages"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get paginated merged PO and Acceptance data"""
+    """
+    Get paginated merged PO and Acceptance data
+    
+    Pass next_cursor from the previous response as after_po_no/after_po_line
+    to page by key instead of OFFSET; page is then ignored. include_total=false
+    skips the COUNT query. Responses carry an ETag; a matching If-None-Match
+    gets a 304 without running any query.
+    """
     try:
         user_id = str(current_user.id)
         
-        # Build filter conditions
-        filter_conditions = ["po.user_id = :user_id"]
-        params = {"user_id": user_id}
+        etag = data_etag(request, user_id)
+        etag_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=etag_headers)
         
-        if project_name:
-            filter_conditions.append("po.project_name ILIKE :project_name")
-            params["project_name"] = f"%{project_name}%"
+        flags, params = _merged_params(
+            user_id, status, category, project_name, account_name, site_code, search
+        )
+        
+        use_cursor = after_po_no is not None or after_po_line is not None
+        if use_cursor and (after_po_no is None or after_po_line is None):
+            raise HTTPException(
+                status_code=400,
+                detail="after_po_no and after_po_line must be provided together"
+            )
+        count_query, data_query = _merged_list_statements(flags, use_cursor)
+        
+        # Count query (optional, it scans the whole filtered set)
+        total_count = None
+        total_pages = None
+        if include_total:
+            count_result = (await db.execute(count_query, params)).scalar()
+            total_count = count_result or 0
+            
+            if total_count == 0:
+                return FastJSONResponse({
+                    "items": [],
+                    "total_count": 0,
+                    "page": page,
+                    "per_page": per_page,
+                    "total_pages": 0,
+                    "has_next": False,
+                    "has_prev": False,
+                    "next_cursor": None
+                }, headers=etag_headers)
             
-        if search:
-            filter_conditions.append("(po.po_number ILIKE :search OR po.item_description ILIKE :search)")
-            params["search"] = f"%{search}%"
-        
-        where_clause = " AND ".join(filter_conditions)
-        base_query = MERGED_DATA_QUERY.format(base_filter=where_clause)
-        
-        # Apply additional filters on the subquery
-        if status or category or account_name or site_code:
-            filter_subquery = f"SELECT * FROM ({base_query}) as subquery WHERE 1=1"
-            if status:
-                filter_subquery += " AND subquery.status = :status"
-                params["status"] = status
-            if category:
-                filter_subquery += " AND subquery.category = :category"  
-                params["category"] = category
-            if account_name:
-                filter_subquery += " AND subquery.account_name ILIKE :account_name"
-                params["account_name"] = f"%{account_name}%"
-            if site_code:
-                filter_subquery += " AND subquery.site_code ILIKE :site_code"
-                params["site_code"] = f"%{site_code}%"
-            base_query = filter_subquery
-        
-        # Count query
-        count_query = text(f"SELECT COUNT(*) as total FROM ({base_query}) as count_subquery")
-        count_result = db.execute(count_query, params).scalar()
-        total_count = count_result or 0
-        
-        if total_count == 0:
-            return {
-                "items": [],
-                "total_count": 0,
-                "page": page,
-                "per_page": per_page,
-                "total_pages": 0,
-                "has_next": False,
-                "has_prev": False
-            }
-        
-        # Data query with pagination
-        offset = (page - 1) * per_page
-        data_query_str = f"{base_query} ORDER BY po_no DESC, po_line ASC LIMIT :limit OFFSET :offset"
-        params.update({"limit": per_page, "offset": offset})
-        
-        data_query = text(data_query_str)
-        result = db.execute(data_query, params)
-        merged_data = result.mappings().all()
-        
-        # Calculate pagination info
-        total_pages = (total_count + per_page - 1) // per_page
-        
-        return {
+            total_pages = (total_count + per_page - 1) // per_page
+        
+        if use_cursor:
+            params.update({"after_po_no": after_po_no, "after_po_line": after_po_line})
+            offset = 0
+        else:
+            offset = (page - 1) * per_page
+        params.update({"limit": per_page + 1, "offset": offset})
+        
+        result = await db.execute(data_query, params)
+        keys = tuple(result.keys())
+        rows = result.all()
+        
+        has_next = len(rows) > per_page
+        # Plain dicts built in C; RowMapping would go through the orjson default hook per row
+        merged_data = [dict(zip(keys, row)) for row in rows[:per_page]]
+        
+        next_cursor = None
+        if has_next:
+            last_row = merged_data[-1]
+            next_cursor = {"after_po_no": last_row["po_no"], "after_po_line": last_row["po_line"]}
+        
+        # Rows go straight to orjson, skipping the jsonable_encoder walk
+        return FastJSONResponse({
             "items": merged_data,
             "total_count": total_count,
             "page": page,
             "per_page": per_page,
             "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_prev": page > 1
-        }
+            "has_next": has_next,
+            "has_prev": use_cursor or page > 1,
+            "next_cursor": next_cursor
+        }, headers=etag_headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error querying merged data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error querying merged data: {str(e)}")
@@ -117,93 +289,63 @@ async def export_merged_data(
     account_name: Optional[str] = Query(None, description="Filter by account name"),
     site_code: Optional[str] = Query(None, description="Filter by site code"),
     search: Optional[str] = Query(None, description="Search in PO number or item description"),
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="File format: xlsx or csv"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Export filtered merged PO and Acceptance data to Excel file"""
+    """
+    Export filtered merged PO and Acceptance data to Excel or CSV
+    
+    format=csv skips the xlsx zip/XML work and is much cheaper to produce
+    for large exports.
+    """
     try:
         user_id = str(current_user.id)
         
-        # Build filter conditions
-        filter_conditions = ["po.user_id = :user_id"]
-        params = {"user_id": user_id}
+        base_query, params = _build_merged_query(
+            user_id, status, category, project_name, account_name, site_code, search
+        )
+        
+        # Stream rows through a server-side cursor, one partition at a time
+        export_query = EXPORT_CSV_QUERY if format == "csv" else EXPORT_QUERY
+        query = cached_statement(export_query.format(base_query=base_query))
         
-        if project_name:
-            filter_conditions.append("po.project_name ILIKE :project_name")
-            params["project_name"] = f"%{project_name}%"
-            
-        if search:
-            filter_conditions.append("(po.po_number ILIKE :search OR po.item_description ILIKE :search)")
-            params["search"] = f"%{search}%"
-        
-        where_clause = " AND ".join(filter_conditions)
-        base_query = MERGED_DATA_QUERY.format(base_filter=where_clause)
-        
-        # Apply additional filters
-        if status or category or account_name or site_code:
-            filter_subquery = f"SELECT * FROM ({base_query}) as subquery WHERE 1=1"
-            if status:
-                filter_subquery += " AND subquery.status = :status"
-                params["status"] = status
-            if category:
-                filter_subquery += " AND subquery.category = :category"  
-                params["category"] = category
-            if account_name:
-                filter_subquery += " AND subquery.account_name ILIKE :account_name"
-                params["account_name"] = f"%{account_name}%"
-            if site_code:
-                filter_subquery += " AND subquery.site_code ILIKE :site_code"
-                params["site_code"] = f"%{site_code}%"
-            base_query = filter_subquery
-        
-        # Execute query
-        query = text(f"{base_query} ORDER BY po_no, po_line")
-        result = db.execute(query, params)
-        merged_data = result.mappings().all()
-        
-        if not merged_data:
+        def open_export():
+            result = db.connection().execution_options(stream_results=True).execute(query, params)
+            partitions = result.partitions(EXPORT_CHUNK_SIZE)
+            # Peek at the first partition so an empty export is still a clean 404
+            return partitions, next(partitions, None)
+        
+        # Blocking DB work runs in a worker thread; StreamingResponse does the same
+        # for the sync xlsx generator below
+        partitions, first_partition = await run_in_threadpool(open_export)
+        if not first_partition:
             raise HTTPException(status_code=404, detail="No data found to export")
         
-        # Convert to pandas DataFrame
-        data_dict = []
-        for item in merged_data:
-            data_dict.append({
-                'PO ID': item.po_id,
-                'PO Number': item.po_no,
-                'PO Line': item.po_line,
-                'Account': item.account_name,
-                'Project': item.project_name,
-                'Site Code': item.site_code,
-                'Category': item.category,
-                'Item Description': item.item_desc,
-                'Payment Terms': item.payment_terms,
-                'Unit Price': float(item.unit_price) if item.unit_price else 0,
-                'Requested Qty': item.req_qty,
-                'Line Amount': float(item.line_amount) if item.line_amount else 0,
-                'Publish Date': item.publish_date.strftime('%Y-%m-%d') if item.publish_date else '',
-                'AC Amount': float(item.ac_amount) if item.ac_amount else 0,
-                'AC Date': item.ac_date.strftime('%Y-%m-%d') if item.ac_date else '',
-                'PAC Amount': float(item.pac_amount) if item.pac_amount else 0,
-                'PAC Date': item.pac_date.strftime('%Y-%m-%d') if item.pac_date else '',
-                'Status': item.status,
-                'Remaining Amount': float(item.remaining) if item.remaining else 0  
-            })
-        
-        df = pd.DataFrame(data_dict)
-        
-        # Create Excel file in memory
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Merged PO Data', index=False)
-        
-        output.seek(0)
+        row_batches = chain([first_partition], partitions)
+        if format == "csv":
+            return StreamingResponse(
+                iter_csv(row_batches, EXPORT_COLUMNS),
+                media_type='text/csv',
+                headers={"Content-Disposition": "attachment; filename=filtered_merged_po_data.csv"}
+            )
+        
+        # Rows already match the sheet layout; the file is streamed one partition at a time
+        body = iter_xlsx(
+            row_batches,
+            EXPORT_COLUMNS,
+            'Merged PO Data',
+            date_columns=EXPORT_DATE_COLUMNS
+        )
         
         return StreamingResponse(
-            BytesIO(output.getvalue()),
+            body,
             media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             headers={"Content-Disposition": "attachment; filename=filtered_merged_po_data.xlsx"}
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error exporting data: {str(e)}")
\ No newline at end of file
@@ -1,12 +1,14 @@
 # app/routers/overview_charts.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
-from app.database import get_db
+from app.database import get_async_db
 from app.auth import get_current_user
 from app.models import User
 from app.services.overview_charts_service import OverviewChartsService
+from app.utils.response_cache import cached_json_response
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,8 @@ router = APIRouter(prefix="/api/overview-charts", tags=["overview-charts"])
 
 @router.get("")
 async def get_overview_charts(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -104,14 +107,21 @@ async def get_overview_charts(
     - Monthly period: 1st to last day of current month
     - Quarter period: Current quarter (Q1: Jan-Mar, Q2: Apr-Jun, Q3: Jul-Sep, Q4: Oct-Dec)
     - Yearly period: January 1 to December 31 of current year
+    - Cached per user for 60 seconds (dropped as soon as new data is uploaded)
     """
     try:
-        service = OverviewChartsService(db)
         user_id = str(current_user.id)
         
-        result = service.get_overview_charts(user_id)
+        def build_charts(session: Session):
+            return OverviewChartsService(session).get_overview_charts(user_id)
         
-        return result
+        # Sync service code on the async session: SQL waits don't block the event loop
+        return await cached_json_response(
+            request,
+            user_id,
+            lambda: db.run_sync(build_charts),
+            ttl=60
+        )
         
     except Exception as e:
         logger.error(f"Error in get_overview_charts: {str(e)}")
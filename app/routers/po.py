@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 import logging
 
-from app.database import get_db
+from app.database import get_async_db
 from app.auth import get_current_user
 from app.models import User
 from app.services.po_service import POService
+from app.utils.fast_json import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -20,22 +22,25 @@ async def get_po_data(
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     po_status: Optional[str] = Query(None, description="Filter by PO status"),
     search: Optional[str] = Query(None, description="Search in PO number or item description"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get paginated PO data with optional filters"""
     try:
-        po_service = POService(db)
         user_id = str(current_user.id)
         
-        return po_service.get_po_data(
-            user_id=user_id,
-            page=page,
-            per_page=per_page,
-            project_name=project_name,
-            po_status=po_status,
-            search=search
-        )
+        def fetch_page(session: Session):
+            return POService(session).get_po_data(
+                user_id=user_id,
+                page=page,
+                per_page=per_page,
+                project_name=project_name,
+                po_status=po_status,
+                search=search
+            )
+        
+        # Sync service code on the async session: SQL waits don't block the event loop
+        return FastJSONResponse(await db.run_sync(fetch_page))
     except Exception as e:
         logger.error(f"Error in get_po_data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching PO data: {str(e)}")
\ No newline at end of file
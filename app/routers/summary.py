@@ -1,30 +1,147 @@
 # app/routers/summary.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional
-from io import BytesIO
-import pandas as pd
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from functools import partial
+from itertools import chain
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 import logging
-from datetime import datetime, timedelta
+import tempfile
+from datetime import date, datetime, timedelta, timezone
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.auth import get_current_user
 from app.models import User
 from app.services.summary_service import SummaryBuilderService
+from app.utils.fast_csv import iter_csv
+from app.utils.fast_json import FastJSONResponse
+from app.utils.response_cache import cached_json_response, data_etag, etag_matches
+from app.tasks import enqueue_export_job, get_export_job
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/summary", tags=["summary"])
 
+# Filter dropdown data only changes on upload, which bumps the user's data version
+FILTER_OPTIONS_TTL_SECONDS = 300
 
+# Bytes per chunk when streaming a finished xlsx file
+EXPORT_XLSX_CHUNK_BYTES = 64 * 1024
+
+# Finished xlsx files larger than this are spooled to disk instead of held in memory
+EXPORT_XLSX_SPOOL_BYTES = 8 * 1024 * 1024
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _default_week_window(today: date) -> Tuple[date, date]:
+    """
+    Week start dates of the last 5 weeks: the Monday four weeks before
+    today's week through today, across New Year if need be
+    """
+    current_week_start = today - timedelta(days=today.weekday())
+    return current_week_start - timedelta(weeks=4), today
+
+
+def _export_period(
+    summary_type: str,
+    year: Optional[int],
+    month: Optional[int],
+    week: Optional[int]
+) -> Tuple[str, Dict[str, Any]]:
+    """Period type and the period filters that summary type accepts (unknown types export monthly)"""
+    if summary_type == "yearly":
+        return "yearly", {}
+    elif summary_type == "weekly":
+        return "weekly", {"year": year, "week": week}
+    else:  # monthly
+        return "monthly", {"year": year, "month": month}
+
+
+def _totals_rows(overall_totals: Dict[str, Any]) -> List[List[Any]]:
+    """Rows of the Overall Totals sheet"""
+    financial_totals = overall_totals["financial_totals"]
+    return [
+        ['Total Records', overall_totals["total_records"]],
+        ['Unique POs', overall_totals["unique_pos"]],
+        ['Unique Projects', overall_totals["unique_projects"]],
+        ['Total Line Amount', financial_totals["total_line_amount"]],
+        ['Total AC Amount', financial_totals["total_ac_amount"]],
+        ['Total PAC Amount', financial_totals["total_pac_amount"]],
+        ['Total Remaining Amount', financial_totals["total_remaining_amount"]],
+        ['Paid Amount (Period)', financial_totals["paid_amount"]],
+        ['Overall Completion Rate %', overall_totals["overall_completion_rate"]]
+    ]
+
+
+def _write_summary_workbook(
+    target: Union[str, BinaryIO],
+    header: Sequence[str],
+    row_batches: Iterable[Iterable[Sequence[Any]]],
+    totals_rows: List[List[Any]],
+    max_records: int
+) -> None:
+    """
+    Write-only workbook: rows are serialized as they are appended instead of kept as cells
+    
+    The Overall Totals sheet gets a warning row when the export hit max_records.
+    """
+    workbook = Workbook(write_only=True)
+    bold = Font(bold=True)
+    
+    def header_row(sheet, values):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.font = bold
+            cells.append(cell)
+        return cells
+    
+    summary_sheet = workbook.create_sheet('Summary Data')
+    summary_sheet.append(header_row(summary_sheet, header))
+    rows_written = 0
+    for rows in row_batches:
+        for row in rows:
+            summary_sheet.append(tuple(row))
+        rows_written += len(rows)
+    
+    if rows_written >= max_records:
+        logger.warning(f"Export truncated to {max_records} records")
+        totals_rows = [[
+            '⚠️ WARNING',
+            f'Export limited to {max_records} records. Use filters to narrow results.'
+        ]] + totals_rows
+    
+    totals_sheet = workbook.create_sheet('Overall Totals')
+    totals_sheet.append(header_row(totals_sheet, ['Metric', 'Value']))
+    for row in totals_rows:
+        totals_sheet.append(row)
+    
+    workbook.save(target)
+
+
+def _iter_buffer(buffer: BinaryIO) -> Iterator[bytes]:
+    """Fixed-size chunks of a binary buffer (iterating a file directly splits on newlines)"""
+    return iter(partial(buffer.read, EXPORT_XLSX_CHUNK_BYTES), b"")
+
+
+# The list endpoints are plain def: FastAPI runs them in its threadpool, so the
+# synchronous summary queries don't block the event loop
 @router.get("/monthly")
-async def get_monthly_summary(
+def get_monthly_summary(
+    request: Request,
     year: Optional[int] = Query(None, description="Filter by year (e.g., 2024)"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Filter by month (1-12)"),
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     page: int = Query(1, ge=1, description="Page number (starts at 1)"),
     per_page: int = Query(50, ge=1, le=500, description="Items per page (max 500)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Fill total_count/total_pages (may run a COUNT query)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -36,22 +153,36 @@ async def get_monthly_summary(
     Returns aggregated data grouped by project and month.
     Use pagination to load data in chunks.
     
+    Responses carry an ETag; a matching If-None-Match gets a 304 without
+    running any query.
+    
     **Query Parameters:**
     - `year`: Filter by specific year (optional)
     - `month`: Filter by specific month 1-12 (optional, requires year)
     - `project_name`: Filter by project name (optional)
     - `page`: Page number starting from 1 (default: 1)
     - `per_page`: Records per page, max 500 (default: 50)
+    - `cursor`: `pagination.next_cursor` of the previous page; seeks instead of
+      using OFFSET, so deep pages cost the same as the first one
+    - `include_total`: set to false to skip counting all groups (total_count and
+      total_pages are then null; use has_next)
     
     **Example:**
     - Get first page: `/api/summary/monthly?page=1&per_page=50`
     - Get specific month: `/api/summary/monthly?year=2024&month=3&page=1`
     - Get project data: `/api/summary/monthly?project_name=IAM&page=1`
+    - Next page by cursor: `/api/summary/monthly?cursor=<next_cursor>`
     """
     try:
-        service = SummaryBuilderService(db)
         user_id = str(current_user.id)
         
+        # Summaries only change on upload; a matching ETag skips the queries
+        etag = data_etag(request, user_id)
+        etag_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=etag_headers)
+        
+        service = SummaryBuilderService(db)
         result = service.get_summary_paginated(
             user_id=user_id,
             period_type="monthly",
@@ -59,23 +190,31 @@ async def get_monthly_summary(
             month=month,
             project_name=project_name,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total
         )
         
-        return result
+        # Nested summaries go straight to orjson, skipping the jsonable_encoder walk
+        return FastJSONResponse(result, headers=etag_headers)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in get_monthly_summary: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching monthly summary: {str(e)}")
 
 
 @router.get("/weekly")
-async def get_weekly_summary(
+def get_weekly_summary(
+    request: Request,
     year: Optional[int] = Query(None, description="Filter by year"),
     week: Optional[int] = Query(None, ge=1, le=53, description="Filter by week number (1-53)"),
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     page: int = Query(1, ge=1, description="Page number (starts at 1)"),
     per_page: int = Query(50, ge=1, le=500, description="Items per page (max 500)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Fill total_count/total_pages (may run a COUNT query)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -87,43 +226,66 @@ async def get_weekly_summary(
     Returns aggregated data grouped by project and week.
     Default: Shows last 5 weeks if no filters provided.
     
+    Responses carry an ETag; a matching If-None-Match gets a 304 without
+    running any query.
+    
     **Query Parameters:**
     - `year`: Filter by specific year (optional)
     - `week`: Filter by specific week 1-53 (optional, requires year)
     - `project_name`: Filter by project name (optional)
     - `page`: Page number starting from 1 (default: 1)
     - `per_page`: Records per page, max 500 (default: 50)
+    - `cursor`: `pagination.next_cursor` of the previous page (replaces `page`)
+    - `include_total`: set to false to skip counting all groups
     """
     try:
-        service = SummaryBuilderService(db)
         user_id = str(current_user.id)
         
-        # If no year/week filter, default to current year
+        # If no year/week filter, default to the last 5 weeks (UTC dates)
+        period_start = None
+        period_end = None
         if year is None and week is None:
-            year = datetime.now().year
+            period_start, period_end = _default_week_window(datetime.now(tz=timezone.utc).date())
         
+        # The default window moves with the calendar, so it is part of the ETag
+        etag = data_etag(request, user_id, variant=f"{period_start}:{period_end}")
+        etag_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=etag_headers)
+        
+        service = SummaryBuilderService(db)
         result = service.get_summary_paginated(
             user_id=user_id,
             period_type="weekly",
             year=year,
             week=week,
+            period_start=period_start,
+            period_end=period_end,
             project_name=project_name,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total
         )
         
-        return result
+        # Nested summaries go straight to orjson, skipping the jsonable_encoder walk
+        return FastJSONResponse(result, headers=etag_headers)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in get_weekly_summary: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching weekly summary: {str(e)}")
 
 
 @router.get("/yearly")
-async def get_yearly_summary(
+def get_yearly_summary(
+    request: Request,
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     page: int = Query(1, ge=1, description="Page number (starts at 1)"),
     per_page: int = Query(50, ge=1, le=500, description="Items per page (max 500)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Fill total_count/total_pages (may run a COUNT query)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -133,21 +295,35 @@ async def get_yearly_summary(
     **NEW: Now paginated to prevent memory issues!**
     
     Returns aggregated data grouped by project and year.
+    
+    Responses carry an ETag; a matching If-None-Match gets a 304 without
+    running any query.
+    Pass `pagination.next_cursor` as `cursor` to fetch the next page.
     """
     try:
-        service = SummaryBuilderService(db)
         user_id = str(current_user.id)
         
+        etag = data_etag(request, user_id)
+        etag_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=etag_headers)
+        
+        service = SummaryBuilderService(db)
         result = service.get_summary_paginated(
             user_id=user_id,
             period_type="yearly",
             project_name=project_name,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total
         )
         
-        return result
+        # Nested summaries go straight to orjson, skipping the jsonable_encoder walk
+        return FastJSONResponse(result, headers=etag_headers)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in get_yearly_summary: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching yearly summary: {str(e)}")
@@ -155,6 +331,7 @@ async def get_yearly_summary(
 
 @router.get("/periods")
 async def get_available_periods(
+    request: Request,
     period_type: str = Query("monthly", description="Period type: monthly, weekly, yearly"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -164,6 +341,7 @@ async def get_available_periods(
     
     Returns a list of available years/months/weeks that have data.
     Use this to populate filter dropdowns in your UI.
+    Cached per user for 5 minutes (invalidated by uploads).
     
     **Examples:**
     - `GET /api/summary/periods?period_type=monthly`
@@ -174,7 +352,12 @@ async def get_available_periods(
         service = SummaryBuilderService(db)
         user_id = str(current_user.id)
         
-        return service.get_available_periods(user_id, period_type)
+        return await cached_json_response(
+            request,
+            user_id,
+            lambda: run_in_threadpool(service.get_available_periods, user_id, period_type),
+            ttl=FILTER_OPTIONS_TTL_SECONDS
+        )
     except Exception as e:
         logger.error(f"Error in get_available_periods: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error retrieving available periods: {str(e)}")
@@ -182,16 +365,24 @@ async def get_available_periods(
 
 @router.get("/projects")
 async def get_project_list(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get list of available project names for filtering"""
+    """Get list of available project names for filtering (cached per user for 5 minutes)"""
     try:
         service = SummaryBuilderService(db)
         user_id = str(current_user.id)
         
-        projects = service.get_project_list(user_id)
-        return {"projects": projects}
+        async def build_projects():
+            return {"projects": await run_in_threadpool(service.get_project_list, user_id)}
+        
+        return await cached_json_response(
+            request,
+            user_id,
+            build_projects,
+            ttl=FILTER_OPTIONS_TTL_SECONDS
+        )
     except Exception as e:
         logger.error(f"Error in get_project_list: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching project list: {str(e)}")
@@ -205,11 +396,12 @@ async def export_summary_data(
     project_name: Optional[str] = Query(None, description="Filter by project name"),
     summary_type: str = Query("monthly", description="Type of summary: 'monthly', 'weekly', or 'yearly'"),
     max_records: int = Query(10000, ge=1, le=50000, description="Maximum records to export (max 50,000)"),
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="File format: xlsx or csv"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Export summary data to Excel
+    Export summary data to Excel or CSV
     
     **IMPORTANT:** Export is limited to prevent memory issues.
     Use filters to narrow down your export if you hit the limit.
@@ -218,152 +410,147 @@ async def export_summary_data(
     
     **Query Parameters:**
     - `max_records`: Maximum records to export (default 10,000, max 50,000)
+    - `format`: `xlsx` (default, with an Overall Totals sheet) or `csv` (summary rows only)
     - Use year/month/week/project_name filters to reduce dataset size
     """
     try:
         service = SummaryBuilderService(db)
         user_id = str(current_user.id)
         
-        # Get data based on summary type with limit
-        if summary_type == "yearly":
-            result = service.get_summary_for_export(
-                user_id, "yearly", 
-                project_name=project_name,
-                max_records=max_records
-            )
-            filename = "yearly_summary.xlsx"
-            
-        elif summary_type == "weekly":
-            result = service.get_summary_for_export(
-                user_id, "weekly", 
-                year=year, 
-                week=week, 
-                project_name=project_name,
-                max_records=max_records
-            )
-            filename = "weekly_summary.xlsx"
-            
-        else:  # monthly
-            result = service.get_summary_for_export(
-                user_id, "monthly", 
-                year=year, 
-                month=month, 
+        period_type, period_filters = _export_period(summary_type, year, month, week)
+        filename = f"{period_type}_summary.{format}"
+        
+        def open_export():
+            result = service.get_export_rows(
+                user_id, period_type,
                 project_name=project_name,
-                max_records=max_records
+                max_records=max_records,
+                **period_filters
             )
-            filename = "monthly_summary.xlsx"
-        
-        data = result["summaries"]
+            # Peek at the first partition so an empty export is still a clean 404
+            return result, next(result["partitions"], None)
         
-        if not data:
+        # Blocking DB work runs in a worker thread
+        result, first_partition = await run_in_threadpool(open_export)
+        if not first_partition:
             raise HTTPException(status_code=404, detail="No data found to export")
         
-        if result.get("truncated", False):
-            logger.warning(f"Export truncated to {max_records} records for user {user_id}")
+        # Rows come back from SQL already flat, in export column order, and are
+        # written one cursor partition at a time
+        header = result["columns"]
+        row_batches = chain([first_partition], result["partitions"])
         
-        # Flatten the nested data structure for Excel export
-        flattened_data = []
-        for item in data:
-            flat_item = {
-                'Project Name': item.get('project_name'),
-                'Period': item.get('period_label'),
-            }
-            
-            # Add period-specific fields
-            if summary_type == "yearly":
-                flat_item['Year'] = item.get('year')
-            elif summary_type == "monthly":
-                flat_item['Year'] = item.get('year')
-                flat_item['Month'] = item.get('month')
-            elif summary_type == "weekly":
-                flat_item['Year'] = item.get('year')
-                flat_item['Week Number'] = item.get('week_number')
-                flat_item['Week Start'] = item.get('period_date')
-            
-            # Add common fields
-            flat_item.update({
-                'Total Records': item.get('total_records'),
-                'Unique POs': item.get('unique_pos'),
-                
-                # Financial data
-                'Total Line Amount': item.get('financial_summary', {}).get('total_line_amount', 0),
-                'Total AC Amount': item.get('financial_summary', {}).get('total_ac_amount', 0),
-                'Total PAC Amount': item.get('financial_summary', {}).get('total_pac_amount', 0),
-                'Total Remaining Amount': item.get('financial_summary', {}).get('total_remaining_amount', 0),
-                
-                # Status data
-                'Closed Count': item.get('status_breakdown', {}).get('closed', 0),
-                'Cancelled Count': item.get('status_breakdown', {}).get('cancelled', 0),
-                'Pending Count': item.get('status_breakdown', {}).get('pending', 0),
-                'Completion Rate %': item.get('status_breakdown', {}).get('completion_rate', 0),
-                
-                # Payment terms
-                'ACPAC 100% Count': item.get('payment_terms_breakdown', {}).get('acpac_100_percent', 0),
-                'AC/PAC Split Count': item.get('payment_terms_breakdown', {}).get('ac_pac_split', 0),
-                
-                # Categories
-                'Survey Count': item.get('category_breakdown', {}).get('survey', 0),
-                'Transportation Count': item.get('category_breakdown', {}).get('transportation', 0),
-                'Site Engineer Count': item.get('category_breakdown', {}).get('site_engineer', 0),
-                'Service Count': item.get('category_breakdown', {}).get('service', 0),
-            })
-            
-            flattened_data.append(flat_item)
-        
-        df = pd.DataFrame(flattened_data)
+        if format == "csv":
+            return StreamingResponse(
+                iter_csv(row_batches, header),
+                media_type='text/csv',
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
         
-        # Create Excel file in memory
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Summary Data', index=False)
-            
-            # Add a second sheet with overall totals if available
-            if "overall_totals" in result:
-                totals_data = [{
-                    'Metric': 'Total Records',
-                    'Value': result["overall_totals"]["total_records"]
-                }, {
-                    'Metric': 'Unique POs',
-                    'Value': result["overall_totals"]["unique_pos"]
-                }, {
-                    'Metric': 'Unique Projects',
-                    'Value': result["overall_totals"]["unique_projects"]
-                }, {
-                    'Metric': 'Total Line Amount',
-                    'Value': result["overall_totals"]["financial_totals"]["total_line_amount"]
-                }, {
-                    'Metric': 'Total AC Amount',
-                    'Value': result["overall_totals"]["financial_totals"]["total_ac_amount"]
-                }, {
-                    'Metric': 'Total PAC Amount',
-                    'Value': result["overall_totals"]["financial_totals"]["total_pac_amount"]
-                }, {
-                    'Metric': 'Total Remaining Amount',  # ADD THIS LINE
-                    'Value': result["overall_totals"]["financial_totals"]["total_remaining_amount"]  # ADD THIS LINE
-                },{
-                    'Metric': 'Paid Amount (Period)',  # ADD THIS NEW FIELD
-                    'Value': result["overall_totals"]["financial_totals"]["paid_amount"]  # ADD THIS NEW FIELD
-                }, {
-                    'Metric': 'Overall Completion Rate %',
-                    'Value': result["overall_totals"]["overall_completion_rate"]
-                }]
-                
-                if result.get("truncated", False):
-                    totals_data.insert(0, {
-                        'Metric': '⚠️ WARNING',
-                        'Value': f'Export limited to {max_records} records. Use filters to narrow results.'
-                    })
-                
-                totals_df = pd.DataFrame(totals_data)
-                totals_df.to_excel(writer, sheet_name='Overall Totals', index=False)
+        # Workbook building is CPU-bound; keep it off the event loop. Large
+        # workbooks roll over to a temp file, so concurrent exports don't each
+        # keep their whole file in memory; it is deleted once streamed.
+        output = tempfile.SpooledTemporaryFile(max_size=EXPORT_XLSX_SPOOL_BYTES)
+        try:
+            await run_in_threadpool(
+                _write_summary_workbook,
+                output, header, row_batches, _totals_rows(result["overall_totals"]), result["max_records"]
+            )
+        except BaseException:
+            output.close()
+            raise
         output.seek(0)
         
         return StreamingResponse(
-            BytesIO(output.getvalue()),
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            _iter_buffer(output),
+            media_type=XLSX_MEDIA_TYPE,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+            background=BackgroundTask(output.close)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting summary data: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error exporting summary data: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error exporting summary data: {str(e)}")
+
+
+@router.post("/export/jobs", status_code=202)
+async def create_summary_export_job(
+    year: Optional[int] = Query(None, description="Filter by year"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Filter by month (1-12)"),
+    week: Optional[int] = Query(None, ge=1, le=53, description="Filter by week (1-53)"),
+    project_name: Optional[str] = Query(None, description="Filter by project name"),
+    summary_type: str = Query("monthly", description="Type of summary: 'monthly', 'weekly', or 'yearly'"),
+    max_records: int = Query(10000, ge=1, le=50000, description="Maximum records to export (max 50,000)"),
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="File format: xlsx or csv"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue a summary export and return immediately
+    
+    Same parameters and file as `GET /api/summary/export`, but the file is
+    built by the background workers, so the request does not hold a database
+    connection while it is generated. Poll `GET /api/summary/export/jobs/{job_id}`
+    until it returns the file.
+    """
+    user_id = str(current_user.id)
+    period_type, period_filters = _export_period(summary_type, year, month, week)
+    filename = f"{period_type}_summary.{format}"
+    
+    def build_export(path: str):
+        db = SessionLocal()
+        try:
+            result = SummaryBuilderService(db).get_export_rows(
+                user_id, period_type,
+                project_name=project_name,
+                max_records=max_records,
+                **period_filters
+            )
+            first_partition = next(result["partitions"], None)
+            if not first_partition:
+                raise LookupError("No data found to export")
+            
+            header = result["columns"]
+            row_batches = chain([first_partition], result["partitions"])
+            
+            if format == "csv":
+                with open(path, "wb") as output:
+                    for chunk in iter_csv(row_batches, header):
+                        output.write(chunk)
+            else:
+                _write_summary_workbook(
+                    path, header, row_batches, _totals_rows(result["overall_totals"]), result["max_records"]
+                )
+        finally:
+            db.close()
+    
+    media_type = 'text/csv' if format == "csv" else XLSX_MEDIA_TYPE
+    job_id = await enqueue_export_job(user_id, filename, media_type, build_export)
+    
+    return {"job_id": job_id, "status": "pending"}
+
+
+@router.get("/export/jobs/{job_id}")
+async def get_summary_export_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download a queued summary export
+    
+    Returns the file once it is ready, 202 with the job status while it is
+    still pending or running, and 404 for unknown jobs or empty exports.
+    """
+    job = get_export_job(job_id, str(current_user.id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    if job["status"] == "done":
+        return FileResponse(job["path"], media_type=job["media_type"], filename=job["filename"])
+    if job["status"] == "no_data":
+        raise HTTPException(status_code=404, detail=job["error"])
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Error exporting summary data: {job['error']}")
+    
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": job["status"]})
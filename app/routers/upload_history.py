@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
+from datetime import datetime
+from typing import Optional
 import logging
 
 from app.database import get_db
@@ -13,23 +15,39 @@ router = APIRouter(prefix="/api/upload-history", tags=["upload-history"])
 
 
 @router.get("")
-async def get_upload_history(
+def get_upload_history(
+    limit: int = Query(50, ge=1, le=200, description="Uploads per page (max 200)"),
+    before: Optional[datetime] = Query(None, description="Cursor: next_cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get all upload history for the current user
+    Get upload history for the current user, newest first
     
     Returns:
-    - List of all uploads with file name, type, total rows, and date
+    - Up to `limit` uploads with file name, type, total rows, and date
+    - next_cursor: pass it as `before` to load older uploads (null on the last page)
     """
     try:
         user_id = str(current_user.id)
         
-        # Get all uploads for this user, ordered by newest first
-        uploads = db.query(UploadHistory).filter(
+        # Uploads for this user, newest first (only the returned columns)
+        uploads = db.query(
+            UploadHistory.file_name,
+            UploadHistory.file_type,
+            UploadHistory.total_rows,
+            UploadHistory.status,
+            UploadHistory.uploaded_at
+        ).filter(
             UploadHistory.user_id == user_id
-        ).order_by(desc(UploadHistory.uploaded_at)).all()
+        )
+        if before is not None:
+            uploads = uploads.filter(UploadHistory.uploaded_at < before)
+        
+        # Fetch one extra row to know whether older uploads exist
+        uploads = uploads.order_by(desc(UploadHistory.uploaded_at)).limit(limit + 1).all()
+        has_more = len(uploads) > limit
+        uploads = uploads[:limit]
         
         # Format simple response
         upload_list = [
@@ -45,7 +63,8 @@ async def get_upload_history(
         
         return {
             "success": True,
-            "data": upload_list
+            "data": upload_list,
+            "next_cursor": upload_list[-1]["uploaded_at"] if has_more else None
         }
         
     except Exception as e:
@@ -14,8 +14,8 @@ class AcceptanceService(BaseService):
                           search: Optional[str] = None) -> Dict[str, Any]:
         """Get paginated Acceptance data with filters"""
         
-        # Base query
-        query = self.db.query(Acceptance).filter(
+        # Base query; plain columns, so rows never lazy-load relationships
+        query = self.db.query(*Acceptance.__table__.columns).filter(
             Acceptance.user_id == user_id
         )
         
@@ -12,7 +12,8 @@ class AuthService(BaseService):
     
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
-        user = self.db.query(User).filter(User.email == email).first()
+        # Emails are stored lowercased at registration, so this probes the unique email index
+        user = self.db.query(User).filter(User.email == email.lower()).first()
         if not user or not verify_password(password, user.password_hash):
             return None
         return user
@@ -10,8 +10,37 @@ class BaseService(ABC):
         self.db = db
     
     def get_paginated_results(self, query, page: int, per_page: int):
-        """Generic pagination helper"""
-        total_count = query.count()
+        """
+        Generic pagination helper
+        
+        The total comes back with the page itself as COUNT(*) OVER(), so the
+        filters run once; a separate count() is only needed when the page is
+        empty (no rows, or a page past the end).
+        
+        A query for a single entity yields its objects; a query for columns
+        yields one dict per row, which skips building ORM objects for
+        read-only listings.
+        """
+        single_entity = len(query.column_descriptions) == 1
+        offset = (page - 1) * per_page
+        rows = (
+            query.add_columns(func.count().over().label("_total"))
+            .offset(offset)
+            .limit(per_page)
+            .all()
+        )
+        
+        if rows:
+            total_count = rows[0]._total
+            if single_entity:
+                items = [row[0] for row in rows]
+            else:
+                items = [dict(row._mapping) for row in rows]
+                for item in items:
+                    del item["_total"]
+        else:
+            total_count = query.count()
+            items = []
         
         if total_count == 0:
             return {
@@ -24,8 +53,6 @@ class BaseService(ABC):
                 "has_prev": False
             }
         
-        offset = (page - 1) * per_page
-        items = query.offset(offset).limit(per_page).all()
         total_pages = (total_count + per_page - 1) // per_page
         
         return {
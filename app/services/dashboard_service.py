@@ -1,101 +1,170 @@
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
-from app.models import PurchaseOrder, Acceptance, Account
+from sqlalchemy import text
 from app.services.base_service import BaseService
-from app.query import MERGED_DATA_QUERY
+from app.summary_views import MERGED_VIEW
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Merged PO/acceptance rows of :user_id, precomputed in the merged materialized view
+MERGED_ROWS_SQL = f"SELECT * FROM {MERGED_VIEW} WHERE user_id = :user_id"
+
 class DashboardService(BaseService):
-    def __init__(self, db: Session):
-        super().__init__(db)
+    """Stateless dashboard queries; every method takes the session explicitly"""
     
-    def get_data_status(self, user_id: str) -> Dict[str, Any]:
-        """Check data status with raw counts from purchase_orders and acceptances"""
-        # Raw counts from purchase_orders and acceptances tables
-        po_count = self.db.query(PurchaseOrder).filter(
-            PurchaseOrder.user_id == user_id
-        ).count()
-        
-        acceptance_count = self.db.query(Acceptance).filter(
-            Acceptance.user_id == user_id
-        ).count()
-        
-        # Get last upload dates from merged data
-        date_query = text(f"""
+    # Breakdown queries over the merged rows; {source} is a subquery or CTE name
+    STATUS_BREAKDOWN_SQL = """
+        SELECT 
+            subquery.status,
+            COUNT(*) as count,
+            COALESCE(SUM(subquery.line_amount), 0) as total_value,
+            COALESCE(SUM(subquery.remaining), 0) as pending_amount,
+            ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (), 2) as percentage
+        FROM {source} as subquery
+        GROUP BY subquery.status
+    """
+    
+    ACCOUNT_ANALYSIS_SQL = """
         SELECT 
-            MAX(subquery.publish_date) as last_po_upload,
-            MAX(COALESCE(subquery.ac_date, subquery.pac_date)) as last_acceptance_upload
-        FROM (
-            {MERGED_DATA_QUERY.format(base_filter="po.user_id = :user_id")}
-        ) as subquery
-        """)
-        dates = self.db.execute(date_query, {"user_id": user_id}).first()
+            COALESCE(subquery.account_name, 'Unknown') as account_name,
+            COUNT(*) as total_records,
+            COALESCE(SUM(subquery.line_amount), 0) as total_value,
+            COALESCE(SUM(subquery.remaining), 0) as pending_amount,
+            COUNT(CASE WHEN subquery.status = 'CLOSED' THEN 1 END) as closed_count
+        FROM {source} as subquery
+        GROUP BY subquery.account_name
+        ORDER BY total_value DESC
+        LIMIT 20
+    """
+    
+    PAYMENT_TERMS_SQL = """
+        SELECT 
+            subquery.payment_terms,
+            COUNT(*) as count,
+            COALESCE(SUM(subquery.line_amount), 0) as total_value
+        FROM {source} as subquery
+        GROUP BY subquery.payment_terms
+    """
+    
+    # Statements are built once with the class; the engine then finds their
+    # compiled form in its cache instead of re-parsing the SQL per request
+    
+    # Raw counts, matching PO lines and last upload dates from merged data, in one round-trip
+    DATA_STATUS_QUERY = text(f"""
+    SELECT 
+        (SELECT COUNT(*) FROM purchase_orders WHERE user_id = :user_id) as po_count,
+        (SELECT COUNT(*) FROM acceptances WHERE user_id = :user_id) as acceptance_count,
+        (
+            -- PO lines are unique per user (uq_user_po_line), so no DISTINCT is needed
+            SELECT COUNT(*)
+            FROM purchase_orders po
+            WHERE po.user_id = :user_id
+                AND EXISTS (
+                    SELECT 1 FROM acceptances a
+                    WHERE a.user_id = po.user_id
+                        AND a.po_number = po.po_number
+                        AND a.po_line_no = po.po_line_no
+                )
+        ) as matching_count,
+        MAX(subquery.publish_date) as last_po_upload,
+        MAX(COALESCE(subquery.ac_date, subquery.pac_date)) as last_acceptance_upload
+    FROM (
+        {MERGED_ROWS_SQL}
+    ) as subquery
+    """)
+    
+    # Counts, financial totals and every breakdown as JSON columns, over one read of the merged rows
+    ANALYTICS_QUERY = text(f"""
+    WITH merged AS MATERIALIZED (
+        {MERGED_ROWS_SQL}
+    )
+    SELECT
+        (SELECT COUNT(*) FROM purchase_orders WHERE user_id = :user_id) as po_count,
+        (SELECT COUNT(*) FROM acceptances WHERE user_id = :user_id) as acceptance_count,
+        (
+            SELECT COUNT(DISTINCT a.id)
+            FROM accounts a
+            INNER JOIN merged ON a.project_name = merged.project_name
+            WHERE a.user_id = :user_id AND a.needs_review = TRUE
+        ) as accounts_needing_review,
+        (
+            SELECT json_build_object(
+                'total_records', COUNT(*),
+                'total_value', COALESCE(SUM(line_amount), 0),
+                'total_ac_amount', COALESCE(SUM(ac_amount), 0),
+                'total_pac_amount', COALESCE(SUM(pac_amount), 0)
+            )
+            FROM merged
+        ) as financial_stats,
+        (
+            SELECT COALESCE(json_agg(grouped ORDER BY grouped.total_value DESC), '[]'::json)
+            FROM ({STATUS_BREAKDOWN_SQL.format(source="merged")}) as grouped
+        ) as status_breakdown,
+        (
+            SELECT COALESCE(json_agg(grouped ORDER BY grouped.total_value DESC), '[]'::json)
+            FROM ({ACCOUNT_ANALYSIS_SQL.format(source="merged")}) as grouped
+        ) as account_analysis,
+        (
+            SELECT COALESCE(json_agg(grouped ORDER BY grouped.total_value DESC), '[]'::json)
+            FROM ({PAYMENT_TERMS_SQL.format(source="merged")}) as grouped
+        ) as payment_terms_distribution
+    """)
+    
+    @classmethod
+    def get_data_status(cls, db: Session, user_id: str) -> Dict[str, Any]:
+        """Check data status with raw counts from purchase_orders and acceptances"""
+        status = db.execute(cls.DATA_STATUS_QUERY, {"user_id": user_id}).first()
         
         return {
-            "has_data": po_count > 0 and acceptance_count > 0,
-            "po_count": po_count,
-            "acceptance_count": acceptance_count,
-            "last_po_upload": dates.last_po_upload.isoformat() if dates and dates.last_po_upload else None,
-            "last_acceptance_upload": dates.last_acceptance_upload.isoformat() if dates and dates.last_acceptance_upload else None,
+            "has_data": status.po_count > 0 and status.acceptance_count > 0,
+            "po_count": status.po_count,
+            "acceptance_count": status.acceptance_count,
+            "last_po_upload": status.last_po_upload.isoformat() if status.last_po_upload else None,
+            "last_acceptance_upload": status.last_acceptance_upload.isoformat() if status.last_acceptance_upload else None,
             "data_quality": {
-                "po_with_acceptances": self._get_matching_po_count(user_id),
-                "total_pos": po_count
+                "po_with_acceptances": status.matching_count or 0,
+                "total_pos": status.po_count
             }
         }
     
-    def get_dashboard_analytics(self, user_id: str) -> Dict[str, Any]:
-        """Get comprehensive dashboard analytics with raw counts and merged data for analytics"""
+    @classmethod
+    def get_dashboard_analytics(cls, db: Session, user_id: str) -> Dict[str, Any]:
+        """
+        Get comprehensive dashboard analytics with raw counts and merged data for analytics
+        
+        Everything comes from one statement: the user's merged rows are read
+        once into a MATERIALIZED CTE and each breakdown is returned as a JSON column.
+        """
         try:
-            # Raw counts from purchase_orders and acceptances tables
-            po_count = self.db.query(PurchaseOrder).filter(
-                PurchaseOrder.user_id == user_id
-            ).count()
-            
-            acceptance_count = self.db.query(Acceptance).filter(
-                Acceptance.user_id == user_id
-            ).count()
-            
-            # Accounts needing review using merged data
-            accounts_query = text(f"""
-            SELECT COUNT(DISTINCT a.id) as accounts_needing_review
-            FROM accounts a
-            INNER JOIN (
-                {MERGED_DATA_QUERY.format(base_filter="po.user_id = :user_id")}
-            ) as subquery ON a.project_name = subquery.project_name
-            WHERE a.user_id = :user_id AND a.needs_review = TRUE
-            """)
-            accounts = self.db.execute(accounts_query, {"user_id": user_id}).scalar()
-            
-            # Financial totals from merged data
-            financial_stats = self._get_financial_stats(user_id)
-            
-            # Status breakdown, account analysis, and payment terms from merged data
-            status_breakdown = self._get_status_breakdown(user_id)
-            account_analysis = self._get_account_analysis(user_id)
-            payment_terms_dist = self._get_payment_terms_distribution(user_id)
+            result = db.execute(cls.ANALYTICS_QUERY, {"user_id": user_id}).first()
             
             return {
                 "basic_stats": {
-                    "total_pos": po_count,
-                    "total_acceptances": acceptance_count,
-                    "accounts_needing_review": accounts or 0,
-                    **financial_stats
+                    "total_pos": result.po_count,
+                    "total_acceptances": result.acceptance_count,
+                    "accounts_needing_review": result.accounts_needing_review or 0,
+                    **cls._format_financial_stats(result.financial_stats)
                 },
-                "status_breakdown": status_breakdown,
-                "project_analysis": account_analysis,  # Renamed to account_analysis internally
-                "payment_terms_distribution": payment_terms_dist
+                "status_breakdown": cls._format_status_breakdown(result.status_breakdown),
+                "project_analysis": cls._format_account_analysis(result.account_analysis),  # Renamed to account_analysis internally
+                "payment_terms_distribution": cls._format_payment_terms(result.payment_terms_distribution)
             }
         except Exception as e:
             logger.error(f"Error getting dashboard analytics: {str(e)}")
             raise
     
-    def get_charts_data(self, user_id: str) -> Dict[str, Any]:
-        """Get structured data specifically for React charts using merged data"""
-        status_breakdown = self._get_status_breakdown(user_id)
-        account_analysis = self._get_account_analysis(user_id)
+    @staticmethod
+    def get_charts_data(analytics: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get structured data specifically for React charts
+        
+        The charts plot the status breakdown and account analysis that
+        get_dashboard_analytics already returns, so they are reshaped from
+        its payload rather than queried again.
+        """
+        status_breakdown = analytics["status_breakdown"]
+        account_analysis = analytics["project_analysis"][:10]  # Top 10
         
         return {
             "status_pie_chart": {
@@ -104,131 +173,58 @@ class DashboardService(BaseService):
                 "values": [float(item["total_value"]) for item in status_breakdown]
             },
             "project_bar_chart": {  # Kept key for frontend compatibility
-                "labels": [item["account_name"] for item in account_analysis[:10]],  # Top 10
-                "data": [float(item["total_value"]) for item in account_analysis[:10]],
-                "pending_amounts": [float(item["pending_amount"]) for item in account_analysis[:10]]
+                "labels": [item["account_name"] for item in account_analysis],
+                "data": [float(item["total_value"]) for item in account_analysis],
+                "pending_amounts": [float(item["pending_amount"]) for item in account_analysis]
             }
         }
     
-    def _get_financial_stats(self, user_id: str) -> Dict[str, Any]:
-        """Get financial statistics from merged data"""
-        stats_query = text(f"""
-        SELECT 
-            COUNT(*) as total_records,
-            COALESCE(SUM(subquery.line_amount), 0) as total_value,
-            COALESCE(SUM(subquery.ac_amount), 0) as total_ac_amount,
-            COALESCE(SUM(subquery.pac_amount), 0) as total_pac_amount
-        FROM (
-            {MERGED_DATA_QUERY.format(base_filter="po.user_id = :user_id")}
-        ) as subquery
-        """)
-        
-        result = self.db.execute(stats_query, {"user_id": user_id}).first()
-        
+    @staticmethod
+    def _format_financial_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Financial statistics from a row mapping or JSON object"""
         return {
-            "total_merged_records": result.total_records if result else 0,
-            "total_value": float(result.total_value) if result and result.total_value else 0,
-            "total_ac_amount": float(result.total_ac_amount) if result and result.total_ac_amount else 0,
-            "total_pac_amount": float(result.total_pac_amount) if result and result.total_pac_amount else 0
+            "total_merged_records": stats["total_records"] if stats else 0,
+            "total_value": float(stats["total_value"]) if stats and stats["total_value"] else 0,
+            "total_ac_amount": float(stats["total_ac_amount"]) if stats and stats["total_ac_amount"] else 0,
+            "total_pac_amount": float(stats["total_pac_amount"]) if stats and stats["total_pac_amount"] else 0
         }
     
-    def _get_status_breakdown(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get status breakdown for analytics using merged data"""
-        status_query = text(f"""
-        SELECT 
-            subquery.status,
-            COUNT(*) as count,
-            COALESCE(SUM(subquery.line_amount), 0) as total_value,
-            COALESCE(SUM(subquery.remaining), 0) as pending_amount
-        FROM (
-            {MERGED_DATA_QUERY.format(base_filter="po.user_id = :user_id")}
-        ) as subquery
-        GROUP BY subquery.status
-        ORDER BY total_value DESC
-        """)
-        
-        result = self.db.execute(status_query, {"user_id": user_id})
-        rows = result.fetchall()
-        
-        total_count = sum([row.count for row in rows]) if rows else 0
-        
+    @staticmethod
+    def _format_status_breakdown(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Status breakdown items from row mappings or JSON objects"""
         return [
             {
-                "status": row.status,
-                "count": row.count,
-                "total_value": float(row.total_value) if row.total_value else 0,
-                "pending_amount": float(row.pending_amount) if row.pending_amount else 0,
-                "percentage": round((row.count / total_count) * 100, 2) if total_count > 0 else 0
+                "status": row["status"],
+                "count": row["count"],
+                "total_value": float(row["total_value"]) if row["total_value"] else 0,
+                "pending_amount": float(row["pending_amount"]) if row["pending_amount"] else 0,
+                "percentage": float(row["percentage"])
             }
             for row in rows
         ]
     
-    def _get_account_analysis(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get account-wise analysis using merged data"""
-        account_query = text(f"""
-        SELECT 
-            COALESCE(subquery.account_name, 'Unknown') as account_name,
-            COUNT(*) as total_records,
-            COALESCE(SUM(subquery.line_amount), 0) as total_value,
-            COALESCE(SUM(subquery.remaining), 0) as pending_amount,
-            COUNT(CASE WHEN subquery.status = 'CLOSED' THEN 1 END) as closed_count
-        FROM (
-            {MERGED_DATA_QUERY.format(base_filter="po.user_id = :user_id")}
-        ) as subquery
-        WHERE subquery.account_name IS NOT NULL OR subquery.account_name IS NULL
-        GROUP BY subquery.account_name
-        ORDER BY total_value DESC
-        LIMIT 20
-        """)
-        
-        result = self.db.execute(account_query, {"user_id": user_id})
-        
+    @staticmethod
+    def _format_account_analysis(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Account analysis items from row mappings or JSON objects"""
         return [
             {
-                "account_name": row.account_name,
-                "total_records": row.total_records,
-                "total_value": float(row.total_value) if row.total_value else 0,
-                "pending_amount": float(row.pending_amount) if row.pending_amount else 0,
-                "completion_rate": round((row.closed_count / row.total_records) * 100, 2) if row.total_records > 0 else 0
+                "account_name": row["account_name"],
+                "total_records": row["total_records"],
+                "total_value": float(row["total_value"]) if row["total_value"] else 0,
+                "pending_amount": float(row["pending_amount"]) if row["pending_amount"] else 0,
+                "completion_rate": round((row["closed_count"] / row["total_records"]) * 100, 2) if row["total_records"] > 0 else 0
             }
-            for row in result
+            for row in rows
         ]
     
-    def _get_payment_terms_distribution(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get payment terms distribution using merged data"""
-        payment_query = text(f"""
-        SELECT 
-            subquery.payment_terms,
-            COUNT(*) as count,
-            COALESCE(SUM(subquery.line_amount), 0) as total_value
-        FROM (
-            {MERGED_DATA_QUERY.format(base_filter="po.user_id = :user_id")}
-        ) as subquery
-        GROUP BY subquery.payment_terms
-        ORDER BY total_value DESC
-        """)
-        
-        result = self.db.execute(payment_query, {"user_id": user_id})
-        
+    @staticmethod
+    def _format_payment_terms(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Payment terms distribution items from row mappings or JSON objects"""
         return [
             {
-                "payment_terms": row.payment_terms,
-                "count": row.count,
-                "total_value": float(row.total_value) if row.total_value else 0
+                "payment_terms": row["payment_terms"],
+                "count": row["count"],
+                "total_value": float(row["total_value"]) if row["total_value"] else 0
             }
-            for row in result
+            for row in rows
         ]
-    
-    def _get_matching_po_count(self, user_id: str) -> int:
-        """Get count of POs that have corresponding acceptances"""
-        matching_query = text("""
-        SELECT COUNT(DISTINCT CONCAT(po.po_number, '-', po.po_line_no)) as matching_count
-        FROM purchase_orders po
-        INNER JOIN acceptances a ON po.user_id = a.user_id 
-            AND po.po_number = a.po_number 
-            AND po.po_line_no = a.po_line_no
-        WHERE po.user_id = :user_id
-        """)
-        
-        result = self.db.execute(matching_query, {"user_id": user_id}).scalar()
-        return result or 0
\ No newline at end of file
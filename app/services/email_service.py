@@ -1,10 +1,17 @@
 # app/services/email_service.py
 import os
+import html
 import logging
+import orjson
+from typing import List, Tuple
+from string import Template
+from urllib.parse import urlencode
 
 # Check if resend is installed
 try:
     import resend
+    import requests
+    from requests.adapters import HTTPAdapter
     RESEND_AVAILABLE = True
 except ImportError:
     RESEND_AVAILABLE = False
@@ -12,158 +19,64 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+RESEND_TIMEOUT_SECONDS = 10
 
-class EmailService:
-    """
-    Email service using Resend for sending password reset emails
-    
-    For development: Logs emails to console
-    For production: Sends via Resend API
-    """
-    
-    def __init__(self):
-        self.resend_api_key = os.getenv("RESEND_API_KEY")
-        self.from_email = os.getenv("FROM_EMAIL", "onboarding@resend.dev")
-        self.frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        self.environment = os.getenv("ENVIRONMENT", "development")
-        
-        # Set Resend API key
-        if self.resend_api_key and RESEND_AVAILABLE:
-            resend.api_key = self.resend_api_key
-    
-    def send_password_reset_email(self, email: str, token: str, user_name: str) -> bool:
-        """
-        Send password reset email
-        
-        Args:
-            email: Recipient email
-            token: Reset token
-            user_name: User's name for personalization
-        
-        Returns:
-            True if sent successfully, False otherwise
-        """
-        reset_link = f"{self.frontend_url}/reset-password?token={token}"
-        
-        if self.environment == "development":
-            # Development: Log to console
-            return self._log_email_to_console(email, user_name, reset_link)
-        else:
-            # Production: Send via Resend
-            return self._send_via_resend(email, user_name, reset_link)
-    
-    def send_password_changed_notification(self, email: str, user_name: str) -> bool:
-        """
-        Send notification that password was changed successfully
-        
-        Args:
-            email: Recipient email
-            user_name: User's name for personalization
-        
-        Returns:
-            True if sent successfully, False otherwise
-        """
-        
-        if self.environment == "development":
-            logger.info(f"📧 Password changed notification would be sent to {email}")
-            print(f"\n✅ Password changed notification for: {email} ({user_name})\n")
-            return True
-        
-        if not self.resend_api_key or not RESEND_AVAILABLE:
-            logger.error("RESEND_API_KEY not configured or resend not installed. Cannot send email.")
-            return False
-        
-        try:
-            html_body = self._get_password_changed_html(user_name)
-            
-            params = {
-                "from": self.from_email,
-                "to": [email],
-                "subject": "✅ Password Changed Successfully",
-                "html": html_body,
-            }
-            
-            response = resend.Emails.send(params)
-            
-            logger.info(f"✅ Password changed notification sent to {email}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send password changed notification: {str(e)}")
-            return False
-    
-    def _send_via_resend(self, to_email: str, user_name: str, reset_link: str) -> bool:
-        """Send email via Resend API for production"""
-        
-        if not self.resend_api_key or not RESEND_AVAILABLE:
-            logger.error("RESEND_API_KEY not configured or resend not installed. Cannot send email.")
-            return False
-        
-        try:
-            # Prepare email parameters
-            params = {
-                "from": self.from_email,
-                "to": [to_email],
-                "subject": "Reset Your Password",
-                "html": self._get_reset_password_html(user_name, reset_link),
-            }
-            
-            # Send email using Resend
-            response = resend.Emails.send(params)
-            
-            logger.info(f"✅ Password reset email sent to {to_email}")
-            logger.debug(f"Resend response: {response}")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to send email to {to_email}: {str(e)}")
-            return False
-    
-    def _get_reset_password_html(self, user_name: str, reset_link: str) -> str:
-        """Generate HTML email body for password reset"""
-        return f"""
+_CONSOLE_RULE = "=" * 80
+
+# Most emails the Resend batch endpoint accepts per call
+RESEND_BATCH_SIZE = 100
+
+# resend.Emails.send opens a new connection (and TLS handshake) per email;
+# one shared session keeps connections to the Resend API alive between sends
+_resend_http = None
+if RESEND_AVAILABLE:
+    _resend_http = requests.Session()
+    _resend_http.mount("https://", HTTPAdapter(pool_maxsize=20))
+
+# Email bodies are parsed once at import; values are HTML-escaped (quotes included,
+# so they are safe in attributes too) before substitution
+_RESET_PASSWORD_TEMPLATE = Template("""
         <!DOCTYPE html>
         <html>
         <head>
             <meta charset="utf-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <style>
-                body {{ 
+                body { 
                     font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
                     line-height: 1.6; 
                     color: #333;
                     margin: 0;
                     padding: 0;
                     background-color: #f4f4f4;
-                }}
-                .container {{ 
+                }
+                .container { 
                     max-width: 600px; 
                     margin: 20px auto; 
                     background-color: white;
                     border-radius: 8px;
                     overflow: hidden;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .header {{ 
+                }
+                .header { 
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     color: white; 
                     padding: 30px 20px; 
                     text-align: center;
-                }}
-                .header h1 {{
+                }
+                .header h1 {
                     margin: 0;
                     font-size: 24px;
                     font-weight: 600;
-                }}
-                .content {{ 
+                }
+                .content { 
                     padding: 40px 30px;
-                }}
-                .content p {{
+                }
+                .content p {
                     margin: 0 0 15px 0;
                     font-size: 16px;
-                }}
-                .button {{ 
+                }
+                .button { 
                     display: inline-block; 
                     padding: 14px 32px; 
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -174,11 +87,11 @@ class EmailService:
                     font-weight: 600;
                     font-size: 16px;
                     transition: transform 0.2s;
-                }}
-                .button:hover {{
+                }
+                .button:hover {
                     transform: translateY(-2px);
-                }}
-                .link-box {{
+                }
+                .link-box {
                     background-color: #f8f9fa;
                     padding: 15px;
                     border-radius: 6px;
@@ -186,29 +99,29 @@ class EmailService:
                     font-size: 14px;
                     color: #666;
                     margin: 20px 0;
-                }}
-                .warning {{ 
+                }
+                .warning { 
                     background-color: #fff3cd;
                     border-left: 4px solid #ffc107;
                     padding: 15px;
                     margin: 20px 0;
                     border-radius: 4px;
-                }}
-                .warning-text {{
+                }
+                .warning-text {
                     color: #856404;
                     font-weight: 600;
                     margin: 0;
-                }}
-                .footer {{ 
+                }
+                .footer { 
                     text-align: center; 
                     padding: 20px; 
                     background-color: #f8f9fa;
                     color: #666; 
                     font-size: 13px;
-                }}
-                .footer p {{
+                }
+                .footer p {
                     margin: 5px 0;
-                }}
+                }
             </style>
         </head>
         <body>
@@ -217,16 +130,16 @@ class EmailService:
                     <h1>🔐 Password Reset Request</h1>
                 </div>
                 <div class="content">
-                    <p>Hello <strong>{user_name}</strong>,</p>
+                    <p>Hello <strong>${user_name}</strong>,</p>
                     
                     <p>We received a request to reset your password. Click the button below to create a new password:</p>
                     
                     <div style="text-align: center;">
-                        <a href="" class="button">Reset Password</a>
+                        <a href="${reset_link}" class="button">Reset Password</a>
                     </div>
                     
                     <p>Or copy and paste this token :</p>
-                    <div class="link-box">{reset_link}</div>
+                    <div class="link-box">${reset_link}</div>
                     
                     <div class="warning">
                         <p class="warning-text">⚠️ This link will expire in 30 minutes.</p>
@@ -243,72 +156,70 @@ class EmailService:
             </div>
         </body>
         </html>
-        """
-    
-    def _get_password_changed_html(self, user_name: str) -> str:
-        """Generate HTML email body for password changed notification"""
-        return f"""
+        """)
+
+_PASSWORD_CHANGED_TEMPLATE = Template("""
         <!DOCTYPE html>
         <html>
         <head>
             <meta charset="utf-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <style>
-                body {{ 
+                body { 
                     font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
                     line-height: 1.6; 
                     color: #333;
                     margin: 0;
                     padding: 0;
                     background-color: #f4f4f4;
-                }}
-                .container {{ 
+                }
+                .container { 
                     max-width: 600px; 
                     margin: 20px auto; 
                     background-color: white;
                     border-radius: 8px;
                     overflow: hidden;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .header {{ 
+                }
+                .header { 
                     background: linear-gradient(135deg, #10b981 0%, #059669 100%);
                     color: white; 
                     padding: 30px 20px; 
                     text-align: center;
-                }}
-                .header h1 {{
+                }
+                .header h1 {
                     margin: 0;
                     font-size: 24px;
                     font-weight: 600;
-                }}
-                .success-icon {{
+                }
+                .success-icon {
                     font-size: 48px;
                     margin-bottom: 10px;
-                }}
-                .content {{ 
+                }
+                .content { 
                     padding: 40px 30px;
-                }}
-                .content p {{
+                }
+                .content p {
                     margin: 0 0 15px 0;
                     font-size: 16px;
-                }}
-                .alert-box {{
+                }
+                .alert-box {
                     background-color: #fff3cd;
                     border-left: 4px solid #ffc107;
                     padding: 15px;
                     margin: 20px 0;
                     border-radius: 4px;
-                }}
-                .footer {{ 
+                }
+                .footer { 
                     text-align: center; 
                     padding: 20px; 
                     background-color: #f8f9fa;
                     color: #666; 
                     font-size: 13px;
-                }}
-                .footer p {{
+                }
+                .footer p {
                     margin: 5px 0;
-                }}
+                }
             </style>
         </head>
         <body>
@@ -318,7 +229,7 @@ class EmailService:
                     <h1>Password Changed Successfully</h1>
                 </div>
                 <div class="content">
-                    <p>Hello <strong>{user_name}</strong>,</p>
+                    <p>Hello <strong>${user_name}</strong>,</p>
                     
                     <p>Your password has been changed successfully. You can now log in with your new password.</p>
                     
@@ -337,27 +248,237 @@ class EmailService:
             </div>
         </body>
         </html>
+        """)
+
+
+
+def _json_template_parts(template: Template) -> list:
+    """
+    Split a template into its static text, pre-encoded as JSON string bytes,
+    and the names of its placeholders
+    """
+    source = template.template
+    parts = []
+    last = 0
+    for match in template.pattern.finditer(source):
+        parts.append(orjson.dumps(source[last:match.start()])[1:-1])
+        if match.group("escaped") is not None:
+            parts.append(b"$")
+        else:
+            parts.append(match.group("named") or match.group("braced"))
+        last = match.end()
+    parts.append(orjson.dumps(source[last:])[1:-1])
+    return parts
+
+
+def _render_json_template(parts: list, **values: str) -> bytes:
+    """JSON string literal of a template filled with HTML-escaped values"""
+    return b'"' + b"".join(
+        part if isinstance(part, bytes) else orjson.dumps(html.escape(values[part]))[1:-1]
+        for part in parts
+    ) + b'"'
+
+
+# Only the user name and link are encoded per email; the ~4KB of static HTML is encoded once here
+_RESET_PASSWORD_JSON_PARTS = _json_template_parts(_RESET_PASSWORD_TEMPLATE)
+_PASSWORD_CHANGED_JSON_PARTS = _json_template_parts(_PASSWORD_CHANGED_TEMPLATE)
+
+
+class EmailService:
+    """
+    Email service using Resend for sending password reset emails
+    
+    For development: Logs emails to console
+    For production: Sends via Resend API
+    """
+    
+    def __init__(self):
+        self.resend_api_key = os.getenv("RESEND_API_KEY")
+        self.from_email = os.getenv("FROM_EMAIL", "onboarding@resend.dev")
+        self.frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
+        self.environment = os.getenv("ENVIRONMENT", "development")
+        self.is_development = self.environment == "development"
+        
+        # Development: log to console; production: send via Resend
+        self._send_reset = self._log_email_to_console if self.is_development else self._send_via_resend
+        
+        # Set Resend API key
+        if self.resend_api_key and RESEND_AVAILABLE:
+            resend.api_key = self.resend_api_key
+        
+        # Sender and subject are the same for every email of a kind; encode them once
+        self._reset_email_head = self._email_head("Reset Your Password")
+        self._changed_email_head = self._email_head("✅ Password Changed Successfully")
+    
+    def send_password_reset_email(self, email: str, token: str, user_name: str) -> bool:
+        """
+        Send password reset email
+        
+        Args:
+            email: Recipient email
+            token: Reset token
+            user_name: User's name for personalization
+        
+        Returns:
+            True if sent successfully, False otherwise
         """
+        return self._send_reset(email, user_name, self._get_reset_link(token))
     
-    def _log_email_to_console(self, to_email: str, user_name: str, reset_link: str) -> bool:
-        """Log email to console for development"""
-        logger.info("=" * 80)
-        logger.info("📧 PASSWORD RESET EMAIL (Development Mode - Using Resend)")
-        logger.info("=" * 80)
-        logger.info(f"To: {to_email}")
-        logger.info(f"User: {user_name}")
-        logger.info(f"Subject: Reset Your Password")
-        logger.info("-" * 80)
-        logger.info(f"🔗 RESET LINK: {reset_link}")
-        logger.info("=" * 80)
+    def send_password_reset_emails_bulk(self, recipients: List[Tuple[str, str, str]]) -> int:
+        """
+        Send password reset emails to many users, RESEND_BATCH_SIZE per API call
+        
+        Args:
+            recipients: (email, token, user_name) tuples
+        
+        Returns:
+            Number of emails sent
+        """
+        if self.is_development:
+            return sum(
+                self.send_password_reset_email(email, token, user_name)
+                for email, token, user_name in recipients
+            )
+        
+        if not self.resend_api_key or not RESEND_AVAILABLE:
+            logger.error("RESEND_API_KEY not configured or resend not installed. Cannot send email.")
+            return 0
+        
+        sent = 0
+        for start in range(0, len(recipients), RESEND_BATCH_SIZE):
+            batch = recipients[start:start + RESEND_BATCH_SIZE]
+            emails = [
+                self._email_json(
+                    self._reset_email_head,
+                    email,
+                    self._get_reset_password_html(user_name, self._get_reset_link(token))
+                )
+                for email, token, user_name in batch
+            ]
+            
+            try:
+                self._post("/emails/batch", b"[" + b",".join(emails) + b"]")
+                sent += len(batch)
+            except Exception as e:
+                logger.error(f"❌ Failed to send batch of {len(batch)} password reset emails: {str(e)}")
+        
+        logger.info(f"✅ Sent {sent}/{len(recipients)} password reset emails")
+        return sent
+    
+    def send_password_changed_notification(self, email: str, user_name: str) -> bool:
+        """
+        Send notification that password was changed successfully
+        
+        Args:
+            email: Recipient email
+            user_name: User's name for personalization
+        
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        
+        if self.is_development:
+            logger.info(f"📧 Password changed notification would be sent to {email} ({user_name})")
+            return True
+        
+        if not self.resend_api_key or not RESEND_AVAILABLE:
+            logger.error("RESEND_API_KEY not configured or resend not installed. Cannot send email.")
+            return False
+        
+        try:
+            self._post_email(self._changed_email_head, email, self._get_password_changed_html(user_name))
+            
+            logger.info(f"✅ Password changed notification sent to {email}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to send password changed notification: {str(e)}")
+            return False
+    
+    def _send_via_resend(self, to_email: str, user_name: str, reset_link: str) -> bool:
+        """Send email via Resend API for production"""
+        
+        if not self.resend_api_key or not RESEND_AVAILABLE:
+            logger.error("RESEND_API_KEY not configured or resend not installed. Cannot send email.")
+            return False
         
-        # Also print to console for visibility
-        print("\n" + "=" * 80)
-        print("📧 PASSWORD RESET EMAIL")
-        print("=" * 80)
-        print(f"To: {to_email}")
-        print(f"User: {user_name}")
-        print(f"🔗 Reset Link: {reset_link}")
-        print("=" * 80 + "\n")
+        try:
+            # Send email using Resend
+            response = self._post_email(
+                self._reset_email_head,
+                to_email,
+                self._get_reset_password_html(user_name, reset_link)
+            )
+            
+            logger.info(f"✅ Password reset email sent to {to_email}")
+            logger.debug(f"Resend response: {response}")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to send email to {to_email}: {str(e)}")
+            return False
+    
+    def _post_email(self, head: bytes, to_email: str, html_json: bytes) -> dict:
+        """POST one email to the Resend API"""
+        return self._post("/emails", self._email_json(head, to_email, html_json))
+    
+    def _email_head(self, subject: str) -> bytes:
+        """Start of an email's JSON body: its sender and subject, object left open"""
+        return orjson.dumps({"from": self.from_email, "subject": subject})[:-1]
+    
+    @staticmethod
+    def _email_json(head: bytes, to_email: str, html_json: bytes) -> bytes:
+        """
+        JSON body of one email
+        
+        head comes from _email_head and html_json is the already JSON-encoded
+        HTML body; only the recipient is encoded here.
+        """
+        return head + b',"to":' + orjson.dumps([to_email]) + b',"html":' + html_json + b"}"
+    
+    def _post(self, path: str, body: bytes) -> dict:
+        """POST a JSON body to the Resend API over the shared keep-alive session"""
+        response = _resend_http.post(
+            f"{resend.api_url}{path}",
+            data=body,
+            headers={
+                "Authorization": f"Bearer {self.resend_api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=RESEND_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def _get_reset_link(self, token: str) -> str:
+        """Frontend URL of the reset form for a token"""
+        return f"{self.frontend_url}/reset-password?{urlencode({'token': token})}"
+    
+    def _get_reset_password_html(self, user_name: str, reset_link: str) -> bytes:
+        """Generate HTML email body for password reset, JSON-encoded"""
+        return _render_json_template(
+            _RESET_PASSWORD_JSON_PARTS,
+            user_name=user_name,
+            reset_link=reset_link
+        )
+    
+    def _get_password_changed_html(self, user_name: str) -> bytes:
+        """Generate HTML email body for password changed notification, JSON-encoded"""
+        return _render_json_template(_PASSWORD_CHANGED_JSON_PARTS, user_name=user_name)
+    
+    def _log_email_to_console(self, to_email: str, user_name: str, reset_link: str) -> bool:
+        """Log email to console for development (one record, so it stays together)"""
+        logger.info("\n".join([
+            _CONSOLE_RULE,
+            "📧 PASSWORD RESET EMAIL (Development Mode - Using Resend)",
+            _CONSOLE_RULE,
+            f"To: {to_email}",
+            f"User: {user_name}",
+            "Subject: Reset Your Password",
+            "-" * 80,
+            f"🔗 RESET LINK: {reset_link}",
+            _CONSOLE_RULE
+        ]))
         
         return True
\ No newline at end of file
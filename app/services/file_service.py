@@ -1,8 +1,10 @@
 # app/services/file_service.py
 import os
+import shutil
 import tempfile
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
 from app.services.base_service import BaseService
 from app.processors.po_processor import process_user_csv
 from app.processors.acceptance_processor import process_user_acceptance_csv
@@ -11,37 +13,59 @@ import logging
 logger = logging.getLogger(__name__)
 
 class FileService(BaseService):
+    """Stateless upload helpers; none of these touch the database session"""
     
-    ALLOWED_EXTENSIONS = {'.csv', '.xlsx', '.xls'}
+    ALLOWED_EXTENSIONS = frozenset({'.csv', '.xlsx', '.xls'})
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    COPY_CHUNK_SIZE = 1024 * 1024  # 1MB
     
-    def validate_file(self, file: UploadFile) -> None:
-        """Validate uploaded file"""
+    @staticmethod
+    def get_file_extension(file: UploadFile) -> str:
+        """Lowercased extension of the uploaded file name, dot included"""
+        return os.path.splitext(file.filename)[1].lower()
+    
+    @classmethod
+    def validate_file(cls, file: UploadFile) -> str:
+        """Validate uploaded file and return its extension"""
         # Check file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        if file_extension not in self.ALLOWED_EXTENSIONS:
+        file_extension = cls.get_file_extension(file)
+        if file_extension not in cls.ALLOWED_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Unsupported file format. Please upload a CSV or Excel file. Got: {file_extension}"
             )
         
         # Check file size (if available)
-        if hasattr(file, 'size') and file.size and file.size > self.MAX_FILE_SIZE:
+        if hasattr(file, 'size') and file.size and file.size > cls.MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=400,
-                detail=f"File size too large. Maximum allowed size is {self.MAX_FILE_SIZE // (1024*1024)}MB"
+                detail=f"File size too large. Maximum allowed size is {cls.MAX_FILE_SIZE // (1024*1024)}MB"
             )
+        
+        return file_extension
     
-    async def save_temp_file(self, file: UploadFile) -> str:
-        """Save uploaded file to temporary location"""
-        file_extension = os.path.splitext(file.filename)[1].lower()
+    @classmethod
+    async def save_temp_file(cls, file: UploadFile, file_extension: Optional[str] = None) -> str:
+        """
+        Save uploaded file to temporary location
+        
+        The upload is copied chunk by chunk from its spooled file in the
+        threadpool, so memory stays at one chunk and the event loop isn't
+        blocked by the disk writes.
+        """
+        if file_extension is None:
+            file_extension = cls.get_file_extension(file)
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            return tmp_file.name
+        def copy_to_temp() -> str:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
+                shutil.copyfileobj(file.file, tmp_file, cls.COPY_CHUNK_SIZE)
+                return tmp_file.name
+        
+        await file.seek(0)
+        return await run_in_threadpool(copy_to_temp)
     
-    def process_po_file(self, file_path: str, user_id: str, filename: str = None) -> Dict[str, Any]:
+    @classmethod
+    def process_po_file(cls, file_path: str, user_id: str, filename: str = None) -> Dict[str, Any]:
         """Process PO file"""
         try:
             result = process_user_csv(file_path, user_id, filename)
@@ -60,9 +84,10 @@ class FileService(BaseService):
                 "stats": {}
             }
         finally:
-            self._cleanup_temp_file(file_path)
+            cls._cleanup_temp_file(file_path)
     
-    def process_acceptance_file(self, file_path: str, user_id: str, filename: str = None) -> Dict[str, Any]:
+    @classmethod
+    def process_acceptance_file(cls, file_path: str, user_id: str, filename: str = None) -> Dict[str, Any]:
         """Process Acceptance file"""
         try:
             result = process_user_acceptance_csv(file_path, user_id, filename)
@@ -81,20 +106,24 @@ class FileService(BaseService):
                 "stats": {}
             }
         finally:
-            self._cleanup_temp_file(file_path)
+            cls._cleanup_temp_file(file_path)
     
-    def _cleanup_temp_file(self, file_path: str) -> None:
+    @staticmethod
+    def _cleanup_temp_file(file_path: str) -> None:
         """Clean up temporary file"""
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Cleaned up temporary file: {file_path}")
-        except Exception as e:
+            os.remove(file_path)
+            logger.info(f"Cleaned up temporary file: {file_path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
             logger.warning(f"Failed to cleanup file {file_path}: {e}")
     
-    def get_file_info(self, file: UploadFile) -> Dict[str, Any]:
+    @classmethod
+    def get_file_info(cls, file: UploadFile, file_extension: Optional[str] = None) -> Dict[str, Any]:
         """Get file information"""
-        file_extension = os.path.splitext(file.filename)[1].lower()
+        if file_extension is None:
+            file_extension = cls.get_file_extension(file)
         
         return {
             "filename": file.filename,
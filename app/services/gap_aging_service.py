@@ -1,14 +1,57 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.services.base_service import BaseService
-from app.query import MERGED_DATA_QUERY
-import pandas as pd
+from app.query import cached_statement
+from app.summary_views import MERGED_VIEW
 from io import BytesIO
+from datetime import date, timedelta
 import logging
+import xlsxwriter
 
 logger = logging.getLogger(__name__)
 
+AGING_HEADER_STYLE = {
+    "bold": True,
+    "font_color": "#FFFFFF",
+    "bg_color": "#366092",
+    "align": "center",
+    "border": 1
+}
+
+# Amount columns are number cells; Excel renders the separators in the reader's locale
+AGING_MONEY_FORMAT = "#,##0.00"
+AGING_NUM_FORMATS = {2: AGING_MONEY_FORMAT, 3: AGING_MONEY_FORMAT, 4: AGING_MONEY_FORMAT, 5: "0.0%"}
+
+# How those columns display, for sizing them
+AGING_DISPLAY_FORMATS = {2: "{:,.2f}", 3: "{:,.2f}", 4: "{:,.2f}", 5: "{:.1%}"}
+
+# Alert level shown by the UI for each bucket
+AGING_ALERT_LEVELS = {
+    "0-15 days": "success",
+    "16-30 days": "info",
+    "31-60 days": "warning",
+    "61-90 days": "danger",
+    "90+ days": "critical"
+}
+
+# Thousands separator to space, decimal point to comma (1 234,56)
+_FRENCH_SEPARATORS = str.maketrans({",": " ", ".": ","})
+
+
+def _format_amount(value: Any) -> str:
+    """Amount with two decimals in the French notation the frontend displays"""
+    return format(float(value), ",.2f").translate(_FRENCH_SEPARATORS)
+
+
+# Fill of the bucket cell, first matching label wins
+AGING_BUCKET_FILLS = [
+    ("0-15", "#C6EFCE"),   # Green
+    ("16-30", "#BDD7EE"),  # Blue
+    ("31-60", "#FFE699"),  # Yellow
+    ("61-90", "#FFCCCC"),  # Orange
+    ("90+", "#FF6B6B"),    # Red
+]
+
 
 class GapAgingService(BaseService):
     """Service for aging analysis of pending purchase orders"""
@@ -16,6 +59,137 @@ class GapAgingService(BaseService):
     def __init__(self, db: Session):
         super().__init__(db)
     
+    def _get_aging_buckets(
+        self,
+        user_id: str,
+        project_name: Optional[str] = None,
+        account_name: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> Tuple[List[Any], Any]:
+        """
+        Raw aging buckets of the user's pending POs and their grand-total row
+        
+        Amounts stay numeric here; get_aging_analysis formats them for the
+        API and the Excel export writes them as number cells.
+        """
+        # Build base filter over the merged view's columns
+        base_filter = "user_id = :user_id"
+        params = {"user_id": user_id}
+        
+        # Add optional filters
+        if project_name:
+            base_filter += " AND project_name ILIKE :project_name"
+            params["project_name"] = f"%{project_name}%"
+        
+        if account_name:
+            base_filter += " AND account_name = :account_name"
+            params["account_name"] = account_name
+        
+        if category:
+            base_filter += " AND category = :category"
+            params["category"] = category
+        
+        # Bucket boundaries as dates, so rows are compared on publish_date itself
+        today = date.today()
+        params.update(
+            today=today,
+            d15=today - timedelta(days=15),
+            d30=today - timedelta(days=30),
+            d60=today - timedelta(days=60),
+            d90=today - timedelta(days=90)
+        )
+        
+        # Build aging analysis query; the merged rows are read from the
+        # materialized view rather than re-joined on every request
+        aging_query = f"""
+        WITH pending_pos AS (
+            SELECT 
+                *,
+                :today - publish_date AS days_old
+            FROM {MERGED_VIEW}
+            WHERE 
+                {base_filter}
+                -- Only pending items
+                AND (ac_date IS NULL OR pac_date IS NULL)
+                AND status NOT IN ('CLOSED', 'CANCELLED')
+                AND publish_date <= :today  -- Safety check for data quality
+                AND remaining > 0
+        ),
+        bucketed_data AS (
+            SELECT 
+                CASE
+                    WHEN publish_date >= :d15 THEN '0-15 days'
+                    WHEN publish_date >= :d30 THEN '16-30 days'
+                    WHEN publish_date >= :d60 THEN '31-60 days'
+                    WHEN publish_date >= :d90 THEN '61-90 days'
+                    ELSE '90+ days'
+                END AS aging_bucket,
+                
+                remaining AS total_amount,
+                
+                -- AC Pending: If AC not paid, remaining = full pending amount
+                CASE 
+                    WHEN ac_date IS NULL THEN remaining 
+                    ELSE 0 
+                END AS ac_pending_amount,
+                
+                -- PAC Pending: If AC paid but PAC not paid, remaining = PAC portion only
+                CASE 
+                    WHEN ac_date IS NOT NULL AND pac_date IS NULL THEN remaining
+                    ELSE 0 
+                END AS pac_pending_amount,
+                
+                days_old
+                
+            FROM pending_pos
+        ),
+        bucket_totals AS (
+            SELECT 
+                aging_bucket,
+                COUNT(*) AS po_count,
+                ROUND(COALESCE(SUM(total_amount), 0), 2) AS total_amount,
+                ROUND(COALESCE(SUM(ac_pending_amount), 0), 2) AS ac_pending_amount,
+                ROUND(COALESCE(SUM(pac_pending_amount), 0), 2) AS pac_pending_amount,
+                ROUND(AVG(days_old), 0) AS avg_days_old
+            FROM bucketed_data
+            GROUP BY aging_bucket
+        )
+        -- One row per bucket plus the grand total (the () grouping set), which
+        -- adds up the rounded bucket figures exactly like the buckets display
+        SELECT 
+            aging_bucket,
+            COALESCE(SUM(po_count), 0)::integer AS po_count,
+            COALESCE(SUM(total_amount), 0) AS total_amount,
+            COALESCE(SUM(ac_pending_amount), 0) AS ac_pending_amount,
+            COALESCE(SUM(pac_pending_amount), 0) AS pac_pending_amount,
+            SUM(avg_days_old) AS avg_days_old,
+            COALESCE(SUM(avg_days_old * po_count), 0) AS weighted_age_sum
+        FROM bucket_totals
+        GROUP BY GROUPING SETS ((aging_bucket), ())
+        ORDER BY 
+            GROUPING(aging_bucket),
+            CASE aging_bucket
+                WHEN '0-15 days' THEN 1
+                WHEN '16-30 days' THEN 2
+                WHEN '31-60 days' THEN 3
+                WHEN '61-90 days' THEN 4
+                WHEN '90+ days' THEN 5
+                ELSE 6
+            END
+        """
+        
+        # Execute query
+        result = self.db.execute(cached_statement(aging_query), params)
+        *rows, totals = result.fetchall()
+        return rows, totals
+    
+    @staticmethod
+    def _average_age(totals: Any) -> int:
+        """Average age in days of all pending POs, from the grand-total row"""
+        if totals.po_count > 0:
+            return int(round(float(totals.weighted_age_sum) / totals.po_count, 0))
+        return 0
+    
     def get_aging_analysis(
         self,
         user_id: str,
@@ -38,138 +212,33 @@ class GapAgingService(BaseService):
             Dictionary with aging buckets and summary statistics
         """
         try:
-            # Build base filter
-            base_filter = "po.user_id = :user_id"
-            params = {"user_id": user_id}
-            
-            # Add optional filters
-            if project_name:
-                base_filter += " AND po.project_name ILIKE :project_name"
-                params["project_name"] = f"%{project_name}%"
-            
-            if account_name:
-                base_filter += " AND acc.account_name = :account_name"
-                params["account_name"] = account_name
-            
-            if category:
-                # Category is calculated in MERGED_DATA_QUERY, so we filter in subquery
-                pass  # Will handle in WHERE clause below
-            
-            # Build aging analysis query - FIXED VERSION
-            aging_query = f"""
-            WITH pending_pos AS (
-                SELECT 
-                    *,
-                    CURRENT_DATE - publish_date AS days_old
-                FROM (
-                    {MERGED_DATA_QUERY.format(base_filter=base_filter)}
-                ) AS merged
-                WHERE 
-                    -- Only pending items
-                    (ac_date IS NULL OR pac_date IS NULL)
-                    AND status NOT IN ('CLOSED', 'CANCELLED')
-                    AND publish_date IS NOT NULL
-                    AND remaining > 0
-                    -- Category filter if provided
-                    {("AND category = :category" if category else "")}
-            ),
-            bucketed_data AS (
-                SELECT 
-                    CASE
-                        WHEN days_old BETWEEN 0 AND 15 THEN '0-15 days'
-                        WHEN days_old BETWEEN 16 AND 30 THEN '16-30 days'
-                        WHEN days_old BETWEEN 31 AND 60 THEN '31-60 days'
-                        WHEN days_old BETWEEN 61 AND 90 THEN '61-90 days'
-                        WHEN days_old > 90 THEN '90+ days'
-                        ELSE 'Unknown'
-                    END AS aging_bucket,
-                    
-                    remaining AS total_amount,
-                    
-                    -- AC Pending: If AC not paid, remaining = full pending amount
-                    CASE 
-                        WHEN ac_date IS NULL THEN remaining 
-                        ELSE 0 
-                    END AS ac_pending_amount,
-                    
-                    -- PAC Pending: If AC paid but PAC not paid, remaining = PAC portion only
-                    CASE 
-                        WHEN ac_date IS NOT NULL AND pac_date IS NULL THEN remaining
-                        ELSE 0 
-                    END AS pac_pending_amount,
-                    
-                    days_old
-                    
-                FROM pending_pos
-                WHERE days_old >= 0  -- Safety check for data quality
+            rows, totals = self._get_aging_buckets(
+                user_id=user_id,
+                project_name=project_name,
+                account_name=account_name,
+                category=category
             )
-            SELECT 
-                aging_bucket,
-                COUNT(*) AS po_count,
-                ROUND(COALESCE(SUM(total_amount), 0), 2) AS total_amount,
-                ROUND(COALESCE(SUM(ac_pending_amount), 0), 2) AS ac_pending_amount,
-                ROUND(COALESCE(SUM(pac_pending_amount), 0), 2) AS pac_pending_amount,
-                ROUND(AVG(days_old), 0) AS avg_days_old
-            FROM bucketed_data
-            GROUP BY aging_bucket
-            ORDER BY 
-                CASE aging_bucket
-                    WHEN '0-15 days' THEN 1
-                    WHEN '16-30 days' THEN 2
-                    WHEN '31-60 days' THEN 3
-                    WHEN '61-90 days' THEN 4
-                    WHEN '90+ days' THEN 5
-                    ELSE 6
-                END
-            """
             
-            # Add category to params if provided
-            if category:
-                params["category"] = category
-            
-            # Execute query
-            result = self.db.execute(text(aging_query), params)
-            rows = result.fetchall()
-            
-            # Calculate totals and build response
-            total_pos = sum(row.po_count for row in rows)
-            total_amount = sum(float(row.total_amount) for row in rows)
-            total_ac_pending = sum(float(row.ac_pending_amount) for row in rows)
-            total_pac_pending = sum(float(row.pac_pending_amount) for row in rows)
-            
-            # Calculate weighted average age
-            weighted_age_sum = sum(row.avg_days_old * row.po_count for row in rows)
-            avg_age = round(weighted_age_sum / total_pos, 0) if total_pos > 0 else 0
+            # Totals come precomputed in the grand-total row, which sorts last
+            total_pos = totals.po_count
             
             # Build aging buckets list
             aging_analysis = []
             for row in rows:
                 percentage = round((row.po_count / total_pos) * 100, 1) if total_pos > 0 else 0
                 
-                bucket_data = {
+                aging_analysis.append({
                     "bucket": row.aging_bucket,
                     "po_count": row.po_count,
-                    "total_amount": f"{float(row.total_amount):,.2f}".replace(',', ' ').replace('.', ','),
-                    "ac_pending_amount": f"{float(row.ac_pending_amount):,.2f}".replace(',', ' ').replace('.', ','),
-                    "pac_pending_amount": f"{float(row.pac_pending_amount):,.2f}".replace(',', ' ').replace('.', ','),
+                    "total_amount": _format_amount(row.total_amount),
+                    "ac_pending_amount": _format_amount(row.ac_pending_amount),
+                    "pac_pending_amount": _format_amount(row.pac_pending_amount),
                     "percentage": f"{percentage}%",
                     "avg_days_old": int(row.avg_days_old),
-                    "status": "Pending"
-                }
-                
-                # Add alert level for UI
-                if row.aging_bucket == '0-15 days':
-                    bucket_data["alert_level"] = "success"
-                elif row.aging_bucket == '16-30 days':
-                    bucket_data["alert_level"] = "info"
-                elif row.aging_bucket == '31-60 days':
-                    bucket_data["alert_level"] = "warning"
-                elif row.aging_bucket == '61-90 days':
-                    bucket_data["alert_level"] = "danger"
-                elif row.aging_bucket == '90+ days':
-                    bucket_data["alert_level"] = "critical"
-                
-                aging_analysis.append(bucket_data)
+                    "status": "Pending",
+                    # Add alert level for UI
+                    "alert_level": AGING_ALERT_LEVELS[row.aging_bucket]
+                })
             
             return {
                 "success": True,
@@ -180,10 +249,10 @@ class GapAgingService(BaseService):
                 },
                 "summary": {
                     "total_pending_pos": total_pos,
-                    "total_pending_amount": f"{total_amount:,.2f}".replace(',', ' ').replace('.', ','),
-                    "total_ac_pending": f"{total_ac_pending:,.2f}".replace(',', ' ').replace('.', ','),
-                    "total_pac_pending": f"{total_pac_pending:,.2f}".replace(',', ' ').replace('.', ','),
-                    "average_age_days": int(avg_age)
+                    "total_pending_amount": _format_amount(totals.total_amount),
+                    "total_ac_pending": _format_amount(totals.ac_pending_amount),
+                    "total_pac_pending": _format_amount(totals.pac_pending_amount),
+                    "average_age_days": self._average_age(totals)
                 },
                 "aging_analysis": aging_analysis
             }
@@ -212,173 +281,134 @@ class GapAgingService(BaseService):
             Excel file as bytes
         """
         try:
-            # Get aging analysis data
-            analysis_data = self.get_aging_analysis(
+            # Get the raw aging buckets; amounts are written as number cells
+            buckets, totals = self._get_aging_buckets(
                 user_id=user_id,
                 project_name=project_name,
                 account_name=account_name,
                 category=category
             )
             
-            if not analysis_data["aging_analysis"]:
+            output = BytesIO()
+            workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+            formats = {}
+            
+            def cell_format(**properties):
+                """Workbook format for a combination of properties, created once"""
+                key = tuple(sorted(properties.items()))
+                if key not in formats:
+                    formats[key] = workbook.add_format(properties)
+                return formats[key]
+            
+            header_format = cell_format(**AGING_HEADER_STYLE)
+            
+            if not buckets:
                 # Create empty Excel with message
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    empty_df = pd.DataFrame({'Message': ['No pending data found']})
-                    empty_df.to_excel(writer, sheet_name='Aging Analysis', index=False)
-                output.seek(0)
+                worksheet = workbook.add_worksheet('Aging Analysis')
+                worksheet.write_row(0, 0, ['Message'], cell_format(bold=True, border=1, align="center"))
+                worksheet.write_row(1, 0, ['No pending data found'])
+                workbook.close()
                 return output.getvalue()
             
             # Prepare data for Excel
-            excel_data = []
-            for bucket in analysis_data["aging_analysis"]:
-                excel_data.append({
-                    "Aging Bucket": bucket["bucket"],
-                    "PO Count": bucket["po_count"],
-                    "Total Amount": bucket["total_amount"],
-                    "AC Pending": bucket["ac_pending_amount"],
-                    "PAC Pending": bucket["pac_pending_amount"],
-                    "% of Total": bucket["percentage"],
-                    "Avg Days Old": bucket["avg_days_old"],
-                    "Status": bucket["status"]
-                })
+            columns = [
+                "Aging Bucket", "PO Count", "Total Amount", "AC Pending",
+                "PAC Pending", "% of Total", "Avg Days Old", "Status"
+            ]
+            total_pos = totals.po_count
+            rows = [
+                [
+                    bucket.aging_bucket,
+                    bucket.po_count,
+                    float(bucket.total_amount),
+                    float(bucket.ac_pending_amount),
+                    float(bucket.pac_pending_amount),
+                    bucket.po_count / total_pos,
+                    int(bucket.avg_days_old),
+                    "Pending"
+                ]
+                for bucket in buckets
+            ]
             
             # Add summary row
-            excel_data.append({
-                "Aging Bucket": "TOTAL",
-                "PO Count": analysis_data["summary"]["total_pending_pos"],
-                "Total Amount": analysis_data["summary"]["total_pending_amount"],
-                "AC Pending": analysis_data["summary"]["total_ac_pending"],
-                "PAC Pending": analysis_data["summary"]["total_pac_pending"],
-                "% of Total": "100%",
-                "Avg Days Old": analysis_data["summary"]["average_age_days"],
-                "Status": "Pending"
-            })
+            average_age = self._average_age(totals)
+            rows.append([
+                "TOTAL",
+                total_pos,
+                float(totals.total_amount),
+                float(totals.ac_pending_amount),
+                float(totals.pac_pending_amount),
+                1,
+                average_age,
+                "Pending"
+            ])
             
-            # Create DataFrame
-            df = pd.DataFrame(excel_data)
+            worksheet = workbook.add_worksheet('Aging Analysis')
+            worksheet.write_row(0, 0, columns, header_format)
             
-            # Create Excel file
-            output = BytesIO()
+            last_col = len(columns) - 1
+            total_row_num = len(rows)
+            for row_num, row in enumerate(rows, start=1):
+                is_total = row_num == total_row_num
+                for col_num, value in enumerate(row):
+                    properties = {
+                        "border": 1,
+                        # First and last columns
+                        "align": "left" if col_num in (0, last_col) else "right"
+                    }
+                    if col_num in AGING_NUM_FORMATS:
+                        properties["num_format"] = AGING_NUM_FORMATS[col_num]
+                    if is_total:
+                        # Bold and gray background on the total row
+                        properties.update(bold=True, bg_color="#E7E6E6")
+                    elif col_num == 0:
+                        # Color code by aging bucket
+                        fill = next(
+                            (color for label, color in AGING_BUCKET_FILLS if label in str(value)),
+                            None
+                        )
+                        if fill:
+                            properties["bg_color"] = fill
+                    worksheet.write(row_num, col_num, value, cell_format(**properties))
             
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Aging Analysis', index=False)
-                
-                # Apply styling
-                worksheet = writer.sheets['Aging Analysis']
-                
-                from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-                
-                # Define styles
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                total_font = Font(bold=True)
-                total_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-                
-                # Color coding for aging buckets
-                success_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")  # Green
-                info_fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")      # Blue
-                warning_fill = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")   # Yellow
-                danger_fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")    # Orange
-                critical_fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")  # Red
-                
-                border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
+            # Auto-adjust column widths
+            for col_num, header in enumerate(columns):
+                display = AGING_DISPLAY_FORMATS.get(col_num, "{}")
+                max_length = max(
+                    len(header),
+                    *(len(display.format(row[col_num])) for row in rows)
                 )
-                
-                # Style header row
-                for col_num in range(1, len(df.columns) + 1):
-                    cell = worksheet.cell(row=1, column=col_num)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = Alignment(horizontal="center")
-                    cell.border = border
-                
-                # Style data rows
-                total_row_num = len(df) + 1
-                for row_num in range(2, len(df) + 2):
-                    bucket_value = worksheet.cell(row=row_num, column=1).value
-                    
-                    for col_num in range(1, len(df.columns) + 1):
-                        cell = worksheet.cell(row=row_num, column=col_num)
-                        cell.border = border
-                        
-                        # Apply bold and gray background to total row
-                        if row_num == total_row_num:
-                            cell.font = total_font
-                            cell.fill = total_fill
-                        # Color code by aging bucket
-                        elif col_num == 1 and bucket_value != "TOTAL":
-                            if "0-15" in str(bucket_value):
-                                cell.fill = success_fill
-                            elif "16-30" in str(bucket_value):
-                                cell.fill = info_fill
-                            elif "31-60" in str(bucket_value):
-                                cell.fill = warning_fill
-                            elif "61-90" in str(bucket_value):
-                                cell.fill = danger_fill
-                            elif "90+" in str(bucket_value):
-                                cell.fill = critical_fill
-                        
-                        # Alignment
-                        if col_num == 1 or col_num == len(df.columns):  # First and last columns
-                            cell.alignment = Alignment(horizontal="left")
-                        else:
-                            cell.alignment = Alignment(horizontal="right")
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-                
-                # Add a summary sheet
-                summary_data = [
-                    {"Metric": "Total Pending POs", "Value": analysis_data["summary"]["total_pending_pos"]},
-                    {"Metric": "Total Pending Amount", "Value": analysis_data["summary"]["total_pending_amount"]},
-                    {"Metric": "AC Pending Amount", "Value": analysis_data["summary"]["total_ac_pending"]},
-                    {"Metric": "PAC Pending Amount", "Value": analysis_data["summary"]["total_pac_pending"]},
-                    {"Metric": "Average Age (Days)", "Value": analysis_data["summary"]["average_age_days"]},
-                ]
-                
-                if project_name:
-                    summary_data.insert(0, {"Metric": "Project Filter", "Value": project_name})
-                if account_name:
-                    summary_data.insert(0, {"Metric": "Account Filter", "Value": account_name})
-                if category:
-                    summary_data.insert(0, {"Metric": "Category Filter", "Value": category})
-                
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Style summary sheet
-                summary_sheet = writer.sheets['Summary']
-                for col_num in range(1, 3):
-                    cell = summary_sheet.cell(row=1, column=col_num)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = Alignment(horizontal="center")
-                    cell.border = border
-                
-                for row_num in range(2, len(summary_data) + 2):
-                    for col_num in range(1, 3):
-                        cell = summary_sheet.cell(row=row_num, column=col_num)
-                        cell.border = border
-                
-                summary_sheet.column_dimensions['A'].width = 25
-                summary_sheet.column_dimensions['B'].width = 30
+                worksheet.set_column(col_num, col_num, min(max_length + 2, 50))
+            
+            # Add a summary sheet
+            summary_data = [
+                ["Total Pending POs", total_pos],
+                ["Total Pending Amount", float(totals.total_amount)],
+                ["AC Pending Amount", float(totals.ac_pending_amount)],
+                ["PAC Pending Amount", float(totals.pac_pending_amount)],
+                ["Average Age (Days)", average_age],
+            ]
+            
+            if project_name:
+                summary_data.insert(0, ["Project Filter", project_name])
+            if account_name:
+                summary_data.insert(0, ["Account Filter", account_name])
+            if category:
+                summary_data.insert(0, ["Category Filter", category])
+            
+            # Style summary sheet
+            summary_sheet = workbook.add_worksheet('Summary')
+            summary_sheet.write_row(0, 0, ["Metric", "Value"], header_format)
+            border_format = cell_format(border=1)
+            money_format = cell_format(border=1, num_format=AGING_MONEY_FORMAT)
+            for row_num, (metric, value) in enumerate(summary_data, start=1):
+                summary_sheet.write(row_num, 0, metric, border_format)
+                summary_sheet.write(row_num, 1, value, money_format if isinstance(value, float) else border_format)
+            
+            summary_sheet.set_column(0, 0, 25)
+            summary_sheet.set_column(1, 1, 30)
             
-            output.seek(0)
+            workbook.close()
             return output.getvalue()
             
         except Exception as e:
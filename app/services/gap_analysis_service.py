@@ -1,21 +1,25 @@
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.services.base_service import BaseService
-from app.query import MERGED_DATA_QUERY  # Import the merge query
-import pandas as pd
+from app.query import MERGED_DATA_QUERY, cached_statement  # Import the merge query
 from io import BytesIO
 from datetime import datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
 import logging
 
 logger = logging.getLogger(__name__)
 
+_THIN_SIDE = Side(style='thin')
+GAP_SUMMARY_BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+
 class GapAnalysisService(BaseService):
-    def __init__(self, db: Session):
-        super().__init__(db)
-    
+    """Stateless gap analysis queries; every method takes the session explicitly"""
 
-    def get_gap_financial_summary_by_project(self, user_id: str, project_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    @staticmethod
+    def get_gap_financial_summary_by_project(db: Session, user_id: str, project_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get gap financial analysis summary in tabular format"""
         try:
             # Build base filter
@@ -71,7 +75,7 @@ class GapAnalysisService(BaseService):
             ORDER BY total_po_received DESC
             """
             
-            result = self.db.execute(text(financial_summary_query), params)
+            result = db.execute(cached_statement(financial_summary_query), params)
             data = result.fetchall()
             column_names = list(result.keys())
             
@@ -119,7 +123,8 @@ class GapAnalysisService(BaseService):
             logger.error(f"Error getting gap financial summary: {str(e)}")
             raise
 
-    def export_gap_financial_summary_to_excel(self, user_id: str, project_name: Optional[str] = None) -> bytes:
+    @staticmethod
+    def export_gap_financial_summary_to_excel(db: Session, user_id: str, project_name: Optional[str] = None) -> bytes:
         """Export gap financial summary directly to Excel"""
         try:
             # Build base filter
@@ -216,69 +221,70 @@ class GapAnalysisService(BaseService):
             ORDER BY sort_order, "Total PO Received" DESC
             """
             
-            result = self.db.execute(text(financial_summary_query), params)
+            result = db.execute(cached_statement(financial_summary_query), params)
             data = result.fetchall()
             column_names = list(result.keys())
             
-            # Convert to DataFrame
-            df = pd.DataFrame(data, columns=column_names)
-            
             # Replace dots with commas for numeric columns
-            numeric_columns = ["Total PO Received", "GAP PO Ok; AC Nok", "GAP AC OK; PAC Nok", "Total GAP AC & PAC"]
-            for col in numeric_columns:
-                df[col] = df[col].apply(lambda x: str(x).replace('.', ','))
+            numeric_columns = {"Total PO Received", "GAP PO Ok; AC Nok", "GAP AC OK; PAC Nok", "Total GAP AC & PAC"}
+            numeric_indexes = [i for i, name in enumerate(column_names) if name in numeric_columns]
+            rows = []
+            for row in data:
+                values = list(row)
+                for i in numeric_indexes:
+                    values[i] = str(values[i]).replace('.', ',')
+                rows.append(values)
             
-            # Create Excel output
-            output = BytesIO()
+            # Write-only workbook: rows are streamed out as they are appended, with
+            # the few styles built once and shared by every cell that uses them
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet('Gap Financial Summary')
             
-            if df.empty:
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    empty_df = pd.DataFrame({'Message': ['No data found']})
-                    empty_df.to_excel(writer, sheet_name='Gap Financial Summary', index=False)
+            if not rows:
+                cell = WriteOnlyCell(worksheet, value='Message')
+                cell.font = Font(bold=True)
+                cell.border = GAP_SUMMARY_BORDER
+                cell.alignment = Alignment(horizontal='center')
+                worksheet.append([cell])
+                worksheet.append(['No data found'])
             else:
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    df.to_excel(writer, sheet_name='Gap Financial Summary', index=False)
-                    
-                    # Apply basic styling
-                    worksheet = writer.sheets['Gap Financial Summary']
-                    
-                    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-                    
-                    # Define styles
-                    header_font = Font(bold=True, color="FFFFFF")
-                    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                    total_font = Font(bold=True)
-                    total_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-                    
-                    # Apply header formatting
-                    for cell in worksheet[1]:
-                        cell.font = header_font
-                        cell.fill = header_fill
-                        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                    
-                    # Auto-adjust column width
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = (max_length + 2)
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
-                    
-                    # Find and format the total row
-                    for row_idx, row in enumerate(worksheet.iter_rows(min_row=2), start=2):
-                        if row[0].value == 'TOTAL':
-                            for cell in row:
-                                cell.font = total_font
-                                cell.fill = total_fill
-                                cell.alignment = Alignment(horizontal='center')
-                    
-            # Seek to beginning of file
-            output.seek(0)
+                header_font = Font(bold=True, color="FFFFFF")
+                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+                header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+                total_font = Font(bold=True)
+                total_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+                total_alignment = Alignment(horizontal='center')
+                
+                # Column widths must be set before the first row is written
+                for col_idx, name in enumerate(column_names, start=1):
+                    max_length = max(len(str(value)) for value in [name, *(row[col_idx - 1] for row in rows)])
+                    worksheet.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
+                
+                header_cells = []
+                for name in column_names:
+                    cell = WriteOnlyCell(worksheet, value=name)
+                    cell.font = header_font
+                    cell.fill = header_fill
+                    cell.alignment = header_alignment
+                    cell.border = GAP_SUMMARY_BORDER
+                    header_cells.append(cell)
+                worksheet.append(header_cells)
+                
+                for row in rows:
+                    if row[0] != 'TOTAL':
+                        worksheet.append(row)
+                        continue
+                    total_cells = []
+                    for value in row:
+                        cell = WriteOnlyCell(worksheet, value=value)
+                        cell.font = total_font
+                        cell.fill = total_fill
+                        cell.alignment = total_alignment
+                        total_cells.append(cell)
+                    worksheet.append(total_cells)
+            
+            output = BytesIO()
+            workbook.save(output)
             
             return output.getvalue()
             
@@ -1,9 +1,8 @@
 # app/services/overview_charts_service.py
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.services.base_service import BaseService
-from app.query import MERGED_DATA_QUERY
+from app.query import MERGED_DATA_QUERY, cached_statement
 from datetime import datetime, timedelta
 import calendar
 import logging
@@ -62,120 +61,80 @@ class OverviewChartsService(BaseService):
                 WHERE publish_date IS NOT NULL
             )
             SELECT 
+                -- One pass over base_data; each period is an aggregate FILTER
+                
                 -- ========== TOTAL (All Time) ==========
                 -- Total PO: Based on publish_date
-                SUM(CASE 
-                    WHEN status != 'CANCELLED' 
-                    THEN COALESCE(line_amount, 0) 
-                    ELSE 0 
-                END) as total_received,
+                SUM(line_amount) FILTER (WHERE status != 'CANCELLED') as total_received,
                 
                 -- Total Paid: Based on AC + PAC dates (when payments actually happened)
-                SUM(
-                    CASE WHEN ac_date IS NOT NULL THEN COALESCE(ac_amount, 0) ELSE 0 END +
-                    CASE WHEN pac_date IS NOT NULL THEN COALESCE(pac_amount, 0) ELSE 0 END
-                ) as total_paid,
+                COALESCE(SUM(ac_amount) FILTER (WHERE ac_date IS NOT NULL), 0) +
+                COALESCE(SUM(pac_amount) FILTER (WHERE pac_date IS NOT NULL), 0) as total_paid,
                 
                 -- ========== WEEKLY (Current Week) ==========
                 -- Total PO published this week
-                SUM(CASE 
-                    WHEN publish_date >= :week_start 
-                    AND publish_date <= :week_end 
+                SUM(line_amount) FILTER (
+                    WHERE publish_date >= :week_start AND publish_date <= :week_end
                     AND status != 'CANCELLED'
-                    THEN COALESCE(line_amount, 0) 
-                    ELSE 0 
-                END) as weekly_received,
+                ) as weekly_received,
                 
                 -- Total Paid this week (AC + PAC payments made this week)
-                SUM(
-                    CASE 
-                        WHEN ac_date >= :week_start AND ac_date <= :week_end 
-                        THEN COALESCE(ac_amount, 0) 
-                        ELSE 0 
-                    END +
-                    CASE 
-                        WHEN pac_date >= :week_start AND pac_date <= :week_end 
-                        THEN COALESCE(pac_amount, 0) 
-                        ELSE 0 
-                    END
-                ) as weekly_paid,
+                COALESCE(SUM(ac_amount) FILTER (
+                    WHERE ac_date >= :week_start AND ac_date <= :week_end
+                ), 0) +
+                COALESCE(SUM(pac_amount) FILTER (
+                    WHERE pac_date >= :week_start AND pac_date <= :week_end
+                ), 0) as weekly_paid,
                 
                 -- ========== MONTHLY (Current Month) ==========
                 -- Total PO published this month
-                SUM(CASE 
-                    WHEN publish_date >= :month_start 
-                    AND publish_date <= :month_end 
+                SUM(line_amount) FILTER (
+                    WHERE publish_date >= :month_start AND publish_date <= :month_end
                     AND status != 'CANCELLED'
-                    THEN COALESCE(line_amount, 0) 
-                    ELSE 0 
-                END) as monthly_received,
+                ) as monthly_received,
                 
                 -- Total Paid this month (AC + PAC payments made this month)
-                SUM(
-                    CASE 
-                        WHEN ac_date >= :month_start AND ac_date <= :month_end 
-                        THEN COALESCE(ac_amount, 0) 
-                        ELSE 0 
-                    END +
-                    CASE 
-                        WHEN pac_date >= :month_start AND pac_date <= :month_end 
-                        THEN COALESCE(pac_amount, 0) 
-                        ELSE 0 
-                    END
-                ) as monthly_paid,
+                COALESCE(SUM(ac_amount) FILTER (
+                    WHERE ac_date >= :month_start AND ac_date <= :month_end
+                ), 0) +
+                COALESCE(SUM(pac_amount) FILTER (
+                    WHERE pac_date >= :month_start AND pac_date <= :month_end
+                ), 0) as monthly_paid,
                 
                 -- ========== QUARTER (Current Quarter) ==========
                 -- Total PO published this quarter
-                SUM(CASE 
-                    WHEN publish_date >= :quarter_start 
-                    AND publish_date <= :quarter_end 
+                SUM(line_amount) FILTER (
+                    WHERE publish_date >= :quarter_start AND publish_date <= :quarter_end
                     AND status != 'CANCELLED'
-                    THEN COALESCE(line_amount, 0) 
-                    ELSE 0 
-                END) as quarter_received,
+                ) as quarter_received,
                 
                 -- Total Paid this quarter (AC + PAC payments made this quarter)
-                SUM(
-                    CASE 
-                        WHEN ac_date >= :quarter_start AND ac_date <= :quarter_end 
-                        THEN COALESCE(ac_amount, 0) 
-                        ELSE 0 
-                    END +
-                    CASE 
-                        WHEN pac_date >= :quarter_start AND pac_date <= :quarter_end 
-                        THEN COALESCE(pac_amount, 0) 
-                        ELSE 0 
-                    END
-                ) as quarter_paid,
+                COALESCE(SUM(ac_amount) FILTER (
+                    WHERE ac_date >= :quarter_start AND ac_date <= :quarter_end
+                ), 0) +
+                COALESCE(SUM(pac_amount) FILTER (
+                    WHERE pac_date >= :quarter_start AND pac_date <= :quarter_end
+                ), 0) as quarter_paid,
                 
                 -- ========== YEARLY (Current Year) ==========
                 -- Total PO published this year
-                SUM(CASE 
-                    WHEN publish_date >= :year_start 
-                    AND publish_date <= :year_end 
+                SUM(line_amount) FILTER (
+                    WHERE publish_date >= :year_start AND publish_date <= :year_end
                     AND status != 'CANCELLED'
-                    THEN COALESCE(line_amount, 0) 
-                    ELSE 0 
-                END) as yearly_received,
+                ) as yearly_received,
                 
                 -- Total Paid this year (AC + PAC payments made this year)
-                SUM(
-                    CASE 
-                        WHEN ac_date >= :year_start AND ac_date <= :year_end 
-                        THEN COALESCE(ac_amount, 0) 
-                        ELSE 0 
-                    END +
-                    CASE 
-                        WHEN pac_date >= :year_start AND pac_date <= :year_end 
-                        THEN COALESCE(pac_amount, 0) 
-                        ELSE 0 
-                    END
-                ) as yearly_paid
+                COALESCE(SUM(ac_amount) FILTER (
+                    WHERE ac_date >= :year_start AND ac_date <= :year_end
+                ), 0) +
+                COALESCE(SUM(pac_amount) FILTER (
+                    WHERE pac_date >= :year_start AND pac_date <= :year_end
+                ), 0) as yearly_paid
                 
             FROM base_data
             """
             
-            result = self.db.execute(text(overview_query), params).first()
+            result = self.db.execute(cached_statement(overview_query), params).first()
             
             if not result:
                 return self._empty_response()
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from fastapi import BackgroundTasks
 
 from app.models import User, PasswordResetToken
 from app.auth import get_password_hash
@@ -15,6 +16,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# EmailService only holds configuration, so one instance serves every request
+_email_service = EmailService()
+
 
 class PasswordResetService:
     """
@@ -29,14 +33,19 @@ class PasswordResetService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.email_service = EmailService()
+        self.email_service = _email_service
     
-    def create_reset_token(self, email: str) -> Tuple[bool, str]:
+    def create_reset_token(
+        self,
+        email: str,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Tuple[bool, str]:
         """
         Create a password reset token for the user
         
         Args:
             email: User's email address
+            background_tasks: If given, the email is sent after the response instead of inline
         
         Returns:
             Tuple of (success, message)
@@ -91,16 +100,7 @@ class PasswordResetService:
             
             # Send email with the plain token (not the hash!)
             user_name = f"{user.prenom} {user.nom}"
-            email_sent = self.email_service.send_password_reset_email(
-                email=user.email,
-                token=token,
-                user_name=user_name
-            )
-            
-            if email_sent:
-                logger.info(f"✅ Password reset email sent to {user.email}")
-            else:
-                logger.error(f"❌ Failed to send password reset email to {user.email}")
+            self._dispatch(background_tasks, self._send_reset_email, user.email, token, user_name)
             
             return True, "If an account exists with this email, a reset link has been sent."
             
@@ -158,13 +158,19 @@ class PasswordResetService:
             logger.error(f"Error verifying reset token: {str(e)}")
             return False, None, "An error occurred while verifying the token"
     
-    def reset_password(self, token: str, new_password: str) -> Tuple[bool, str]:
+    def reset_password(
+        self,
+        token: str,
+        new_password: str,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Tuple[bool, str]:
         """
         Reset user password using a valid token
         
         Args:
             token: The reset token
             new_password: The new password
+            background_tasks: If given, the confirmation email is sent after the response
         
         Returns:
             Tuple of (success, message)
@@ -209,7 +215,12 @@ class PasswordResetService:
             
             # Send confirmation email
             user_name = f"{user.prenom} {user.nom}"
-            self.email_service.send_password_changed_notification(user.email, user_name)
+            self._dispatch(
+                background_tasks,
+                self.email_service.send_password_changed_notification,
+                user.email,
+                user_name
+            )
             
             logger.info(f"✅ Password reset successful for user: {user.email}")
             
@@ -220,6 +231,27 @@ class PasswordResetService:
             self.db.rollback()
             return False, "An error occurred while resetting the password"
     
+    @staticmethod
+    def _dispatch(background_tasks: Optional[BackgroundTasks], func, *args) -> None:
+        """Run func after the response when background tasks are available, else now"""
+        if background_tasks is not None:
+            background_tasks.add_task(func, *args)
+        else:
+            func(*args)
+    
+    def _send_reset_email(self, email: str, token: str, user_name: str) -> None:
+        """Send the reset email and log the outcome"""
+        email_sent = self.email_service.send_password_reset_email(
+            email=email,
+            token=token,
+            user_name=user_name
+        )
+        
+        if email_sent:
+            logger.info(f"✅ Password reset email sent to {email}")
+        else:
+            logger.error(f"❌ Failed to send password reset email to {email}")
+    
     def _hash_token(self, token: str) -> str:
         """
         Hash a token using SHA-256
@@ -1,7 +1,7 @@
 # app/services/po_service.py
 from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
-from app.models import PurchaseOrder
+from app.models import PurchaseOrder, PO_SEARCH_TEXT
 from app.services.base_service import BaseService
 
 class POService(BaseService):
@@ -14,8 +14,8 @@ class POService(BaseService):
                     search: Optional[str] = None) -> Dict[str, Any]:
         """Get paginated PO data with filters"""
         
-        # Base query with user filter
-        query = self.db.query(PurchaseOrder).filter(
+        # Base query with user filter; plain columns, the rows are only serialized
+        query = self.db.query(*PurchaseOrder.__table__.columns).filter(
             PurchaseOrder.user_id == user_id
         )
         
@@ -43,10 +43,7 @@ class POService(BaseService):
         
         if filters.get('search'):
             search_filter = f"%{filters['search']}%"
-            query = query.filter(
-                (PurchaseOrder.po_number.ilike(search_filter)) |
-                (PurchaseOrder.item_description.ilike(search_filter))
-            )
+            query = query.filter(PO_SEARCH_TEXT.ilike(search_filter))
         
         return query
     
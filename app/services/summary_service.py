@@ -1,14 +1,39 @@
 # app/services/summary_service.py
+import base64
+import json
+from datetime import date, datetime
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from app.services.base_service import BaseService
-from app.query import MERGED_DATA_QUERY
+from app.query import MERGED_DATA_QUERY, cached_statement
 from app.utils import aggregation_helpers as agg
+from app.summary_views import MERGED_VIEW, get_summary_view
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round-trip from the server-side cursor during export
+EXPORT_PARTITION_ROWS = 1000
+
+
+def _encode_cursor(values: List[Any]) -> str:
+    """Opaque URL-safe cursor for the last summary row of a page"""
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> List[Any]:
+    """Inverse of _encode_cursor; raises ValueError on anything malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
 
 class SummaryBuilderService(BaseService):
     """
@@ -27,7 +52,11 @@ class SummaryBuilderService(BaseService):
         week: Optional[int] = None,
         project_name: Optional[str] = None,
         page: int = 1,
-        per_page: int = 50
+        per_page: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        period_start: Optional[date] = None,
+        period_end: Optional[date] = None
     ) -> Dict[str, Any]:
         """
         Get paginated summary for any period type
@@ -39,8 +68,12 @@ class SummaryBuilderService(BaseService):
             month: Optional month filter (only for monthly)
             week: Optional week filter (only for weekly)
             project_name: Optional project name filter
-            page: Page number (starts at 1)
+            page: Page number (starts at 1), ignored when cursor is given
             per_page: Records per page (max 500)
+            cursor: next_cursor of the previous page; seeks past it instead of using OFFSET
+            include_total: Fill total_count/total_pages (may need a COUNT query)
+            period_start: Optional earliest week start date (only for weekly)
+            period_end: Optional latest week start date (only for weekly)
         
         Returns:
             Dictionary with paginated summaries and metadata
@@ -49,91 +82,82 @@ class SummaryBuilderService(BaseService):
             # Enforce max per_page
             per_page = min(per_page, 500)
             
-            # Step 1: Build base filter for merged data query
-            base_filter = "po.user_id = :user_id"
-            params = {"user_id": user_id}
-            
-            # Add project filter if provided
-            if project_name:
-                base_filter += " AND po.project_name ILIKE :project_name"
-                params["project_name"] = f"%{project_name}%"
-            
-            # Step 2: Get period-specific SQL fragments
-            period_grouping = agg.get_period_grouping(period_type)
-            period_filter, period_params = agg.get_period_filter(
-                period_type, year, month, week
+            # Step 1: Filter the precomputed summary rows of this period type
+            view = get_summary_view(period_type)
+            summary_filter, params = self._build_summary_view_filter(
+                user_id, period_type, year, month, week, project_name,
+                period_start=period_start, period_end=period_end
             )
-            params.update(period_params)
-            
-            # Step 3: Build count query (for pagination metadata)
-            count_query = f"""
-            SELECT COUNT(*) as total
-            FROM (
-                SELECT DISTINCT
-                    subquery.project_name,
-                    {self._get_group_by_fields(period_type)}
-                FROM (
-                    {MERGED_DATA_QUERY.format(base_filter=base_filter)}
-                ) as subquery
-                WHERE subquery.publish_date IS NOT NULL
-                    AND {period_filter}
-            ) as count_subquery
-            """
-            
-            count_result = self.db.execute(text(count_query), params).scalar()
-            total_count = count_result or 0
-            
-            # Calculate pagination metadata
-            total_pages = (total_count + per_page - 1) // per_page
-            has_next = page < total_pages
-            has_prev = page > 1
-            
-            # Step 4: Build the main query with pagination
-            offset = (page - 1) * per_page
-            params.update({"limit": per_page, "offset": offset})
             
+            # Step 2: Seek past the cursor, or skip whole pages
+            keyset_fields = self._get_keyset_fields(period_type)
+            keyset_filter = "1=1"
+            if cursor:
+                cursor_values = _decode_cursor(cursor)
+                if len(cursor_values) != len(keyset_fields) + 1:
+                    raise ValueError("Invalid cursor")
+                keyset_filter = self._build_keyset_filter(keyset_fields, cursor_values, params)
+                offset = 0
+            else:
+                offset = (page - 1) * per_page
+            
+            # Fetch one extra row to know whether another page exists
+            params.update({"limit": per_page + 1, "offset": offset})
+            
+            # Step 3: Roll the view rows up into one row per (project, period)
+            period_fields = self._get_view_period_fields(period_type)
             summary_query = f"""
             SELECT 
-                subquery.project_name,
-                {period_grouping},
-                
-                -- All financial metrics
-                {agg.get_financial_aggregations()},
-                
-                -- All status counts
-                {agg.get_status_aggregations()},
-                
-                -- Payment terms breakdown
-                {agg.get_payment_terms_aggregations()},
-                
-                -- Category breakdown
-                {agg.get_category_aggregations()},
-                
-                -- Date range
-                {agg.get_date_range_aggregations()}
-                
-            FROM (
-                {MERGED_DATA_QUERY.format(base_filter=base_filter)}
-            ) as subquery
-            WHERE subquery.publish_date IS NOT NULL
-                AND {period_filter}
+                summary.project_name,
+                {period_fields},
+                {agg.get_summary_view_aggregations()}
+            FROM {view} AS summary
+            WHERE {summary_filter}
+                AND {keyset_filter}
             GROUP BY 
-                subquery.project_name,
-                {self._get_group_by_fields(period_type)}
+                summary.project_name,
+                {period_fields}
             ORDER BY 
                 {self._get_order_by_fields(period_type)}
             LIMIT :limit OFFSET :offset
             """
             
-            # Step 5: Execute query
-            result = self.db.execute(text(summary_query), params)
+            # Step 4: Execute query
+            rows = self.db.execute(cached_statement(summary_query), params).fetchall()
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+            has_prev = bool(cursor) or page > 1
+            
+            next_cursor = None
+            if has_next:
+                last_row = rows[-1]
+                next_cursor = _encode_cursor(
+                    [
+                        value if isinstance(value, datetime) else int(value)
+                        for value in (getattr(last_row, name) for name, _ in keyset_fields)
+                    ] + [last_row.project_name]
+                )
+            
+            # Step 5: Total group count, only when it can't be read off this page
+            total_count = None
+            total_pages = None
+            if include_total:
+                if not cursor and not has_next and (rows or offset == 0):
+                    # Last page: everything before it was full
+                    total_count = offset + len(rows)
+                else:
+                    total_count = self._count_summary_groups(
+                        view, summary_filter, keyset_fields, params
+                    )
+                total_pages = (total_count + per_page - 1) // per_page
             
             # Step 6: Format results
-            summaries = self._format_summaries(result, period_type)
+            summaries = self._format_summaries(rows, period_type)
             
             # Step 7: Get overall totals (still needed for context)
             overall_totals = self._get_overall_totals(
-                user_id, period_type, year, month, week, project_name
+                user_id, period_type, year, month, week, project_name,
+                period_start=period_start, period_end=period_end
             )
             
             # Step 8: Return paginated response
@@ -145,7 +169,8 @@ class SummaryBuilderService(BaseService):
                     "total_count": total_count,
                     "total_pages": total_pages,
                     "has_next": has_next,
-                    "has_prev": has_prev
+                    "has_prev": has_prev,
+                    "next_cursor": next_cursor
                 },
                 "overall_totals": overall_totals,
                 "period_type": period_type,
@@ -153,6 +178,8 @@ class SummaryBuilderService(BaseService):
                     "year": year,
                     "month": month,
                     "week": week,
+                    "period_start": period_start,
+                    "period_end": period_end,
                     "project_name": project_name
                 }
             }
@@ -161,7 +188,7 @@ class SummaryBuilderService(BaseService):
             logger.error(f"Error getting paginated {period_type} summary: {str(e)}")
             raise
     
-    def get_summary_for_export(
+    def get_export_rows(
         self,
         user_id: str,
         period_type: str = "monthly",
@@ -172,86 +199,90 @@ class SummaryBuilderService(BaseService):
         max_records: int = 10000
     ) -> Dict[str, Any]:
         """
-        Get summary data for export with a hard limit
+        Get summary rows already flattened to the export column layout
         
-        This method is used by the export endpoint to prevent
-        memory issues when exporting large datasets.
+        Rows are the (project, period) groups of the summary view, at most
+        max_records of them, and the SQL returns one flat row per group with
+        the export headers as column names, so rows can be written to the
+        file as they are.
         
         Args:
             max_records: Maximum number of records to export (default 10,000)
+        
+        Returns:
+            Dictionary with columns, an iterator of row partitions and overall totals
         """
         try:
             # Enforce absolute max of 50,000 records
             max_records = min(max_records, 50000)
             
-            # Build base filter
-            base_filter = "po.user_id = :user_id"
-            params = {"user_id": user_id}
-            
-            if project_name:
-                base_filter += " AND po.project_name ILIKE :project_name"
-                params["project_name"] = f"%{project_name}%"
-            
-            # Get period-specific SQL fragments
-            period_grouping = agg.get_period_grouping(period_type)
-            period_filter, period_params = agg.get_period_filter(
-                period_type, year, month, week
+            view = get_summary_view(period_type)
+            summary_filter, params = self._build_summary_view_filter(
+                user_id, period_type, year, month, week, project_name
             )
-            params.update(period_params)
-            
-            # Build query with limit
             params["limit"] = max_records
             
-            summary_query = f"""
-            SELECT 
-                subquery.project_name,
-                {period_grouping},
-                {agg.get_financial_aggregations()},
-                {agg.get_status_aggregations()},
-                {agg.get_payment_terms_aggregations()},
-                {agg.get_category_aggregations()},
-                {agg.get_date_range_aggregations()}
+            period_columns, export_order = self._get_export_period_columns(period_type)
+            period_fields = self._get_view_period_fields(period_type)
+            
+            export_query = f"""
+            SELECT
+                grouped.project_name AS "Project Name",
+                grouped.period_label AS "Period",
+                {period_columns},
+                grouped.total_records AS "Total Records",
+                grouped.unique_pos AS "Unique POs",
+                grouped.total_line_amount::float8 AS "Total Line Amount",
+                grouped.total_ac_amount::float8 AS "Total AC Amount",
+                grouped.total_pac_amount::float8 AS "Total PAC Amount",
+                grouped.total_remaining_amount::float8 AS "Total Remaining Amount",
+                grouped.closed_count AS "Closed Count",
+                grouped.cancelled_count AS "Cancelled Count",
+                grouped.pending_count AS "Pending Count",
+                COALESCE(ROUND(grouped.closed_count * 100.0 / NULLIF(grouped.total_records, 0), 2), 0)::float8
+                    AS "Completion Rate %",
+                grouped.acpac_100_count AS "ACPAC 100% Count",
+                grouped.ac_pac_split_count AS "AC/PAC Split Count",
+                grouped.survey_count AS "Survey Count",
+                grouped.transportation_count AS "Transportation Count",
+                grouped.site_engineer_count AS "Site Engineer Count",
+                grouped.service_count AS "Service Count"
             FROM (
-                {MERGED_DATA_QUERY.format(base_filter=base_filter)}
-            ) as subquery
-            WHERE subquery.publish_date IS NOT NULL
-                AND {period_filter}
-            GROUP BY 
-                subquery.project_name,
-                {self._get_group_by_fields(period_type)}
-            ORDER BY 
-                {self._get_order_by_fields(period_type)}
+                SELECT 
+                    summary.project_name,
+                    {period_fields},
+                    {agg.get_summary_view_aggregations()}
+                FROM {view} AS summary
+                WHERE {summary_filter}
+                GROUP BY 
+                    summary.project_name,
+                    {period_fields}
+            ) AS grouped
+            ORDER BY {export_order}
             LIMIT :limit
             """
             
-            # Execute query
-            result = self.db.execute(text(summary_query), params)
-            summaries = self._format_summaries(result, period_type)
-            
-            # Check if results were truncated
-            truncated = len(summaries) >= max_records
-            
-            # Get overall totals
+            # Get overall totals before the row stream holds the connection
             overall_totals = self._get_overall_totals(
                 user_id, period_type, year, month, week, project_name
             )
             
+            # Server-side cursor: rows are fetched EXPORT_PARTITION_ROWS at a time
+            # while the caller writes them out
+            result = self.db.connection().execution_options(stream_results=True).execute(
+                cached_statement(export_query), params
+            )
+            
             return {
-                "summaries": summaries,
+                "columns": list(result.keys()),
+                "partitions": result.partitions(EXPORT_PARTITION_ROWS),
                 "overall_totals": overall_totals,
-                "truncated": truncated,
                 "max_records": max_records,
-                "period_type": period_type,
-                "filters_applied": {
-                    "year": year,
-                    "month": month,
-                    "week": week,
-                    "project_name": project_name
-                }
+                "period_type": period_type
             }
             
         except Exception as e:
-            logger.error(f"Error getting export data for {period_type}: {str(e)}")
+            logger.error(f"Error getting export rows for {period_type}: {str(e)}")
             raise
     
     # Keep original get_summary for backward compatibility (but deprecated)
@@ -262,7 +293,9 @@ class SummaryBuilderService(BaseService):
         year: Optional[int] = None,
         month: Optional[int] = None,
         week: Optional[int] = None,
-        project_name: Optional[str] = None
+        project_name: Optional[str] = None,
+        period_start: Optional[date] = None,
+        period_end: Optional[date] = None
     ) -> Dict[str, Any]:
         """
         DEPRECATED: Use get_summary_paginated instead
@@ -281,7 +314,9 @@ class SummaryBuilderService(BaseService):
             week=week,
             project_name=project_name,
             page=1,
-            per_page=1000
+            per_page=1000,
+            period_start=period_start,
+            period_end=period_end
         )
         
         # Return in old format for compatibility
@@ -294,36 +329,152 @@ class SummaryBuilderService(BaseService):
             "warning": "This endpoint is deprecated. Results limited to 1000 records. Use paginated version."
         }
     
-    def _get_group_by_fields(self, period_type: str) -> str:
-        """Get the GROUP BY clause fields for SQL"""
+    def _count_summary_groups(
+        self,
+        view: str,
+        summary_filter: str,
+        keyset_fields: List[tuple],
+        params: Dict[str, Any]
+    ) -> int:
+        """Number of (project, period) groups, counted on the sort keys alone"""
+        count_query = f"""
+        SELECT COUNT(*) as total
+        FROM (
+            SELECT DISTINCT
+                summary.project_name,
+                {", ".join(expression for _, expression in keyset_fields)}
+            FROM {view} AS summary
+            WHERE {summary_filter}
+        ) as count_subquery
+        """
+        
+        return self.db.execute(cached_statement(count_query), params).scalar() or 0
+    
+    def _build_summary_view_filter(
+        self,
+        user_id: str,
+        period_type: str,
+        year: Optional[int],
+        month: Optional[int],
+        week: Optional[int],
+        project_name: Optional[str],
+        period_start: Optional[date] = None,
+        period_end: Optional[date] = None
+    ) -> tuple:
+        """WHERE clause and params selecting the summary view rows of a request"""
+        summary_filter = "summary.user_id = :user_id"
+        params = {"user_id": user_id}
+        
+        if project_name:
+            summary_filter += " AND summary.project_name ILIKE :project_name"
+            params["project_name"] = f"%{project_name}%"
+        
+        period_filter, period_params = agg.get_summary_view_filter(
+            period_type, year, month, week, period_start, period_end
+        )
+        params.update(period_params)
+        
+        return f"{summary_filter} AND {period_filter}", params
+    
+    def _get_view_period_fields(self, period_type: str) -> str:
+        """Period columns of a summary view, selected and grouped on as they are"""
         if period_type == "weekly":
-            return """
-                DATE_TRUNC('week', publish_date),
-                TO_CHAR(DATE_TRUNC('week', publish_date), 'YYYY-MM-DD'),
-                EXTRACT(YEAR FROM DATE_TRUNC('week', publish_date)),
-                EXTRACT(WEEK FROM publish_date)
-            """
+            return "summary.period_date, summary.period_label, summary.year, summary.week_number"
         elif period_type == "monthly":
-            return """
-                EXTRACT(YEAR FROM publish_date),
-                EXTRACT(MONTH FROM publish_date),
-                TO_CHAR(publish_date, 'Month YYYY')
-            """
+            return "summary.year, summary.month, summary.period_label"
         elif period_type == "yearly":
-            return "EXTRACT(YEAR FROM publish_date)"
+            return "summary.year, summary.period_label"
         else:
             raise ValueError(f"Unknown period type: {period_type}")
     
     def _get_order_by_fields(self, period_type: str) -> str:
         """Get the ORDER BY clause for SQL"""
         if period_type == "weekly":
-            return "year DESC, week_number DESC, subquery.project_name ASC"
+            # period_date breaks ties between weeks sharing (year, week_number) around New Year
+            return "year DESC, week_number DESC, period_date DESC, project_name ASC"
+        elif period_type == "monthly":
+            return "year DESC, month DESC, project_name ASC"
+        elif period_type == "yearly":
+            return "year DESC, project_name ASC"
+        else:
+            return "project_name ASC"
+    
+    def _get_export_period_columns(self, period_type: str) -> tuple:
+        """Period columns of the flat export rows and the matching ORDER BY"""
+        if period_type == "weekly":
+            return (
+                'grouped.year::int AS "Year", '
+                'grouped.week_number::int AS "Week Number", '
+                'grouped.period_date::date AS "Week Start"',
+                '"Year" DESC, "Week Number" DESC, "Week Start" DESC, "Project Name" ASC'
+            )
         elif period_type == "monthly":
-            return "year DESC, month DESC, subquery.project_name ASC"
+            return (
+                'grouped.year::int AS "Year", grouped.month::int AS "Month"',
+                '"Year" DESC, "Month" DESC, "Project Name" ASC'
+            )
         elif period_type == "yearly":
-            return "year DESC, subquery.project_name ASC"
+            return (
+                'grouped.year::int AS "Year"',
+                '"Year" DESC, "Project Name" ASC'
+            )
         else:
-            return "subquery.project_name ASC"
+            raise ValueError(f"Unknown period type: {period_type}")
+    
+    def _get_keyset_fields(self, period_type: str) -> List[tuple]:
+        """(output column, summary view column) of the DESC period sort keys"""
+        if period_type == "weekly":
+            return [
+                ("year", "summary.year"),
+                ("week_number", "summary.week_number"),
+                ("period_date", "summary.period_date")
+            ]
+        elif period_type == "monthly":
+            return [
+                ("year", "summary.year"),
+                ("month", "summary.month")
+            ]
+        elif period_type == "yearly":
+            return [("year", "summary.year")]
+        else:
+            raise ValueError(f"Unknown period type: {period_type}")
+    
+    def _build_keyset_filter(
+        self,
+        keyset_fields: List[tuple],
+        cursor_values: List[Any],
+        params: Dict[str, Any]
+    ) -> str:
+        """
+        WHERE clause on the summary view selecting the groups that sort after the cursor
+        
+        The group keys are view columns, so the seek is applied before the
+        rows are rolled up and skipped groups are never summed.
+        """
+        *period_values, cursor_project = cursor_values
+        
+        # project_name sorts ASC with NULLs last
+        if cursor_project is None:
+            condition = "FALSE"
+        else:
+            condition = "(summary.project_name > :cursor_project OR summary.project_name IS NULL)"
+            params["cursor_project"] = str(cursor_project)
+        
+        for index in reversed(range(len(keyset_fields))):
+            name, expression = keyset_fields[index]
+            value = period_values[index]
+            try:
+                params[f"cursor_{name}"] = (
+                    datetime.fromisoformat(value) if name == "period_date" else int(value)
+                )
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            condition = (
+                f"({expression} < :cursor_{name} "
+                f"OR ({expression} = :cursor_{name} AND {condition}))"
+            )
+        
+        return condition
     
     def _format_summaries(self, result, period_type: str) -> List[Dict]:
         """Format SQL results into JSON structure"""
@@ -405,55 +556,53 @@ class SummaryBuilderService(BaseService):
         year: Optional[int],
         month: Optional[int],
         week: Optional[int],
-        project_name: Optional[str]
+        project_name: Optional[str],
+        period_start: Optional[date] = None,
+        period_end: Optional[date] = None
     ) -> Dict[str, Any]:
-        """Calculate overall totals for the filtered dataset"""
+        """
+        Calculate overall totals for the filtered dataset
+        
+        Totals are read from the same views, with the same filter, as the
+        summary rows, so both reflect the same refresh and no request
+        re-runs the PO/acceptance join.
+        """
         try:
-            # Same base filter as main query
-            base_filter = "po.user_id = :user_id"
-            params = {"user_id": user_id}
-            
-            if project_name:
-                base_filter += " AND po.project_name ILIKE :project_name"
-                params["project_name"] = f"%{project_name}%"
-            
-            # Get period filter for publish_date (used for PO counts and totals)
-            period_filter, period_params = agg.get_period_filter(
-                period_type, year, month, week
+            # Same filter as the main query
+            view = get_summary_view(period_type)
+            summary_filter, params = self._build_summary_view_filter(
+                user_id, period_type, year, month, week, project_name,
+                period_start=period_start, period_end=period_end
             )
-            params.update(period_params)
             
-            # Build totals query - SPLIT into two parts
-            # Part 1: Standard totals filtered by publish_date
+            # Part 1: Standard totals filtered by publish_date, rolled up from the period view
             totals_query = f"""
             SELECT 
-                {agg.get_financial_aggregations()},
-                COUNT(DISTINCT subquery.po_id) as unique_pos,
-                COUNT(DISTINCT subquery.project_name) as unique_projects,
-                COUNT(CASE WHEN subquery.status = 'CLOSED' THEN 1 END) as total_closed
-            FROM (
-                {MERGED_DATA_QUERY.format(base_filter=base_filter)}
-            ) as subquery
-            WHERE subquery.publish_date IS NOT NULL
-                AND {period_filter}
+                {agg.get_summary_view_aggregations()},
+                COUNT(DISTINCT summary.project_name) as unique_projects
+            FROM {view} AS summary
+            WHERE {summary_filter}
             """
             
-            result = self.db.execute(text(totals_query), params).first()
+            result = self.db.execute(cached_statement(totals_query), params).first()
+            
+            # Part 2: Calculate paid_amount separately WITHOUT publish_date filter,
+            # over the merged rows (payments are dated by ac_date/pac_date)
+            merged_filter = "subquery.user_id = :user_id"
+            if project_name:
+                merged_filter += " AND subquery.project_name ILIKE :project_name"
             
-            # Part 2: Calculate paid_amount separately WITHOUT publish_date filter
             paid_amount_sql = self._build_paid_amount_sql(period_type, year, month, week)
             paid_query = f"""
             SELECT 
                 {paid_amount_sql}
-            FROM (
-                {MERGED_DATA_QUERY.format(base_filter=base_filter)}
-            ) as subquery
-            WHERE 1=1
+            FROM {MERGED_VIEW} as subquery
+            WHERE {merged_filter}
             """
             
-            paid_result = self.db.execute(text(paid_query), params).first()
+            paid_result = self.db.execute(cached_statement(paid_query), params).first()
             
-            if not result or result.total_records == 0:
+            if not result or not result.total_records:
                 return {
                     "total_records": 0,
                     "unique_pos": 0,
@@ -479,7 +628,7 @@ class SummaryBuilderService(BaseService):
                     "total_remaining_amount": float(result.total_remaining_amount) if result.total_remaining_amount else 0,
                     "paid_amount": float(paid_result.paid_amount) if paid_result and paid_result.paid_amount else 0,
                 },
-                "overall_completion_rate": round((result.total_closed / result.total_records) * 100, 2)
+                "overall_completion_rate": round((result.closed_count / result.total_records) * 100, 2)
             }
             
         except Exception as e:
@@ -599,7 +748,7 @@ class SummaryBuilderService(BaseService):
                 ORDER BY year DESC, week_number DESC
                 """
                 
-                result = self.db.execute(text(periods_query), {"user_id": user_id})
+                result = self.db.execute(cached_statement(periods_query), {"user_id": user_id})
                 
                 return {
                     "period_type": "weekly",
@@ -630,7 +779,7 @@ class SummaryBuilderService(BaseService):
                 ORDER BY year DESC, month DESC
                 """
                 
-                result = self.db.execute(text(periods_query), {"user_id": user_id})
+                result = self.db.execute(cached_statement(periods_query), {"user_id": user_id})
                 
                 # Group by year
                 years = {}
@@ -667,7 +816,7 @@ class SummaryBuilderService(BaseService):
                 ORDER BY year DESC
                 """
                 
-                result = self.db.execute(text(periods_query), {"user_id": user_id})
+                result = self.db.execute(cached_statement(periods_query), {"user_id": user_id})
                 
                 return {
                     "period_type": "yearly",
@@ -696,7 +845,7 @@ class SummaryBuilderService(BaseService):
             ORDER BY subquery.project_name ASC
             """
             
-            result = self.db.execute(text(projects_query), {"user_id": user_id})
+            result = self.db.execute(cached_statement(projects_query), {"user_id": user_id})
             return [row.project_name for row in result if row.project_name]
             
         except Exception as e:
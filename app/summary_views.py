@@ -0,0 +1,140 @@
+# app/summary_views.py
+"""
+Precomputed merged data and period summaries
+
+MERGED_VIEW holds the rows of MERGED_DATA_QUERY for every user, so the
+dashboard and the aging analysis read them by user_id instead of re-running
+the PO/acceptance join on each request. One materialized view per period type holds the
+summary aggregates per (user, project, period), so the summary endpoints
+read a few indexed rows instead of re-aggregating every PO line. PO and
+acceptance data only change through file uploads, which refresh all views
+when they finish; account edits refresh the merged view, which carries
+account names.
+
+A refresh rebuilds the views for every user, so its cost grows with the
+whole database rather than with the uploading user's data. Refreshes are
+therefore requested through app.tasks.request_view_refresh, which runs at
+most one at a time and folds every request made while one is running into
+a single follow-up refresh. A burst of uploads costs two rebuilds instead of
+one each, and CONCURRENTLY refreshes never queue behind each other; the
+trade-off is that the views can lag an upload by up to two rebuilds.
+
+The views are created at startup if missing. CREATE ... IF NOT EXISTS keeps
+an existing view as it is, so a change to MERGED_DATA_QUERY or to the
+aggregates needs the views dropped once to pick it up.
+"""
+import logging
+from sqlalchemy import text
+from app.database import engine
+from app.query import MERGED_DATA_QUERY
+from app.utils import aggregation_helpers as agg
+
+logger = logging.getLogger(__name__)
+
+MERGED_VIEW = "merged_po_acceptance_mv"
+
+SUMMARY_VIEWS = {
+    "weekly": "summary_weekly_mv",
+    "monthly": "summary_monthly_mv",
+    "yearly": "summary_yearly_mv"
+}
+
+# Group keys of each view after user_id; also the columns of its unique index,
+# which REFRESH ... CONCURRENTLY requires. period_label depends on the keys.
+# publish_year splits weeks spanning New Year so the calendar-year filter
+# still matches the rows it did before aggregation.
+SUMMARY_VIEW_KEYS = {
+    "weekly": ["year", "week_number", "period_date", "publish_year", "project_name"],
+    "monthly": ["year", "month", "project_name"],
+    "yearly": ["year", "project_name"]
+}
+
+
+def get_summary_view(period_type: str) -> str:
+    """Name of the materialized view holding the summaries of a period type"""
+    try:
+        return SUMMARY_VIEWS[period_type]
+    except KeyError:
+        raise ValueError(f"Unknown period type: {period_type}")
+
+
+def _merged_view_query() -> str:
+    """SELECT behind the merged view: MERGED_DATA_QUERY rows tagged with their user"""
+    return f"""
+    SELECT u.id as user_id, merged.*
+    FROM users u
+    CROSS JOIN LATERAL (
+        {MERGED_DATA_QUERY.format(base_filter="po.user_id = u.id")}
+    ) as merged
+    """
+
+
+def _summary_view_query(period_type: str) -> str:
+    """SELECT behind a summary view: aggregates per user, project and period"""
+    extra_columns = ""
+    if period_type == "weekly":
+        extra_columns = "EXTRACT(YEAR FROM publish_date) as publish_year,"
+
+    period_keys = [key for key in SUMMARY_VIEW_KEYS[period_type] if key != "project_name"]
+
+    return f"""
+    SELECT
+        u.id as user_id,
+        merged.project_name,
+        {agg.get_period_grouping(period_type)},
+        {extra_columns}
+        {agg.get_financial_aggregations()},
+        {agg.get_status_aggregations()},
+        {agg.get_payment_terms_aggregations()},
+        {agg.get_category_aggregations()},
+        {agg.get_date_range_aggregations()}
+    FROM users u
+    CROSS JOIN LATERAL (
+        {MERGED_DATA_QUERY.format(base_filter="po.user_id = u.id")}
+    ) as merged
+    WHERE merged.publish_date IS NOT NULL
+    GROUP BY u.id, merged.project_name, period_label, {", ".join(period_keys)}
+    """
+
+
+def create_summary_views() -> None:
+    """Create the merged and summary views and their indexes if they don't exist yet"""
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {MERGED_VIEW} AS {_merged_view_query()}"))
+        # PO lines are unique per user (uq_user_po_line), and so are merged rows
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{MERGED_VIEW}_key ON {MERGED_VIEW} (user_id, po_no, po_line)"
+        ))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_{MERGED_VIEW}_status ON {MERGED_VIEW} (user_id, status)"
+        ))
+        
+        for period_type, view in SUMMARY_VIEWS.items():
+            conn.execute(text(
+                f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS {_summary_view_query(period_type)}"
+            ))
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{view}_key ON {view} "
+                f"(user_id, {', '.join(SUMMARY_VIEW_KEYS[period_type])})"
+            ))
+
+
+def refresh_merged_view() -> None:
+    """Recompute the merged view, e.g. after an account is renamed; errors are raised"""
+    with engine.begin() as conn:
+        conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {MERGED_VIEW}"))
+    logger.info("✅ Merged view refreshed")
+
+
+def refresh_summary_views() -> None:
+    """
+    Recompute the merged and summary views after an upload
+
+    CONCURRENTLY keeps the views readable while they are rebuilt. Errors are
+    raised to the caller, which logs them: the upload itself has already
+    been committed.
+    """
+    with engine.begin() as conn:
+        for view in (MERGED_VIEW, *SUMMARY_VIEWS.values()):
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    logger.info("✅ Summary views refreshed")
@@ -1,22 +1,66 @@
 # app/tasks.py
 """
-Background task processing for file uploads
+Background task processing for file uploads and file exports
 """
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
 
-from app.database import SessionLocal
+from app.config import DB_UPLOAD_POOL_SIZE
 from app.services.file_service import FileService
+from app.upload_process import init_upload_process
+from app.utils.response_cache import bump_data_version
+from app.summary_views import refresh_merged_view, refresh_summary_views
 
 logger = logging.getLogger(__name__)
 
 # Global task queue and workers list
 task_queue = asyncio.Queue()
 task_workers = []
+
+# Exports get their own queue and worker, so a long export never holds up
+# upload processing (or the view refresh and cache bump that follow it)
+export_queue = asyncio.Queue()
+export_workers = []
 thread_pool = ThreadPoolExecutor(max_workers=4)
 
 
+# Parsing uploaded CSV/Excel files is CPU-bound, so it runs in worker
+# processes: concurrent uploads then don't share one GIL with each other or
+# with request handling. One process per task worker; spawned rather than
+# forked so each builds its own engine instead of inheriting pooled connections,
+# capped at DB_UPLOAD_POOL_SIZE connections. Spawn re-runs the parent's
+# __main__ script in every worker, so entry points must not import app.main at
+# module level (main.py only hands uvicorn the "app.main:app" string): doing so
+# would rerun startup DDL and build full-size engines before the initializer.
+UPLOAD_PROCESS_WORKERS = 2
+process_pool = ProcessPoolExecutor(
+    max_workers=UPLOAD_PROCESS_WORKERS,
+    mp_context=multiprocessing.get_context("spawn"),
+    initializer=init_upload_process,
+    initargs=(DB_UPLOAD_POOL_SIZE,)
+)
+
+# Finished export files are kept this long for the client to download
+EXPORT_JOB_TTL_SECONDS = 3600
+
+# Export jobs by id: owner, status ('pending', 'running', 'done', 'no_data', 'failed'), file info
+export_jobs: Dict[str, Dict[str, Any]] = {}
+
+# Users whose data changed since the last view refresh started, whether any
+# of them needs the summary views rebuilt too (not just the merged view), and
+# the refresher task while one is running (all only touched on the event loop)
+_refresh_pending_users: Set[str] = set()
+_refresh_summaries_pending = False
+_refresh_task: Optional[asyncio.Task] = None
+
+
 async def task_worker():
     """Background worker that processes tasks from the queue"""
     logger.info("Starting background task worker")
@@ -42,18 +86,34 @@ async def task_worker():
             logger.error(f"Error in task worker: {str(e)}")
 
 
+async def export_worker():
+    """Background worker that builds queued export files"""
+    logger.info("Starting background export worker")
+    while True:
+        try:
+            task_type, task_data = await export_queue.get()
+            
+            if task_type == "shutdown":
+                logger.info("Export worker shutting down")
+                break
+            
+            job_id, builder = task_data
+            await process_export_async(job_id, builder)
+            
+            export_queue.task_done()
+        except Exception as e:
+            logger.error(f"Error in export worker: {str(e)}")
+
+
 async def process_po_file_async(file_path: str, user_id: str, filename: str):
     """Process PO file in background"""
     try:
         logger.info(f"Starting PO file processing for user {user_id}: {filename}")
         
-        db = SessionLocal()
-        file_service = FileService(db)
-        
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
-            thread_pool, 
-            file_service.process_po_file,
+            process_pool,
+            FileService.process_po_file,
             file_path, 
             user_id,
             filename
@@ -65,8 +125,11 @@ async def process_po_file_async(file_path: str, user_id: str, filename: str):
             logger.info(f"   Stats: {result.get('stats')}")
         else:
             logger.error(f"❌ PO file processing failed for user {user_id}: {result.get('message')}")
-            
-        db.close()
+        
+        # Data may have changed even on partial failures; drop cached reads
+        # now and again once the precomputed summaries are rebuilt
+        bump_data_version(user_id)
+        request_view_refresh(user_id)
     except Exception as e:
         logger.error(f"💥 Exception in PO file processing for user {user_id}: {str(e)}")
 
@@ -76,13 +139,10 @@ async def process_acceptance_file_async(file_path: str, user_id: str, filename:
     try:
         logger.info(f"Starting Acceptance file processing for user {user_id}: {filename}")
         
-        db = SessionLocal()
-        file_service = FileService(db)
-        
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
-            thread_pool, 
-            file_service.process_acceptance_file,
+            process_pool,
+            FileService.process_acceptance_file,
             file_path, 
             user_id,
             filename
@@ -94,7 +154,136 @@ async def process_acceptance_file_async(file_path: str, user_id: str, filename:
             logger.info(f"   Stats: {result.get('stats')}")
         else:
             logger.error(f"❌ Acceptance file processing failed for user {user_id}: {result.get('message')}")
-            
-        db.close()
+        
+        # Data may have changed even on partial failures; drop cached reads
+        # now and again once the precomputed summaries are rebuilt
+        bump_data_version(user_id)
+        request_view_refresh(user_id)
+    except Exception as e:
+        logger.error(f"💥 Exception in Acceptance file processing for user {user_id}: {str(e)}")
+
+
+def request_view_refresh(user_id: str, summaries: bool = True) -> None:
+    """
+    Schedule a rebuild of the precomputed views for a user's changed data
+    
+    Returns at once. At most one refresh runs at a time; requests made while
+    it runs are folded into a single follow-up refresh, after which the
+    data version of every user it covers is bumped.
+    
+    Args:
+        user_id: User whose data changed
+        summaries: False when only the merged view is affected (account edits)
+    """
+    global _refresh_task, _refresh_summaries_pending
+    _refresh_pending_users.add(str(user_id))
+    _refresh_summaries_pending = _refresh_summaries_pending or summaries
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.get_event_loop().create_task(_refresh_views_until_idle())
+
+
+async def _refresh_views_until_idle() -> None:
+    """Refresh the views until no user is waiting for one"""
+    global _refresh_summaries_pending
+    loop = asyncio.get_event_loop()
+    while _refresh_pending_users:
+        user_ids = set(_refresh_pending_users)
+        _refresh_pending_users.clear()
+        refresh = refresh_summary_views if _refresh_summaries_pending else refresh_merged_view
+        _refresh_summaries_pending = False
+        try:
+            await loop.run_in_executor(thread_pool, refresh)
+        except Exception as e:
+            logger.error(f"❌ Error in {refresh.__name__} for {len(user_ids)} user(s): {str(e)}")
+        finally:
+            for user_id in user_ids:
+                bump_data_version(user_id)
+
+
+async def wait_for_view_refresh() -> None:
+    """Wait for a running view refresh, e.g. before shutting down"""
+    if _refresh_task is not None:
+        await asyncio.gather(_refresh_task, return_exceptions=True)
+
+
+def _prune_export_jobs() -> None:
+    """Forget expired export jobs and delete their files"""
+    cutoff = time.monotonic() - EXPORT_JOB_TTL_SECONDS
+    for job_id, job in list(export_jobs.items()):
+        if job["created_at"] < cutoff and job["status"] not in ("pending", "running"):
+            if job["path"] and os.path.exists(job["path"]):
+                os.remove(job["path"])
+            export_jobs.pop(job_id, None)
+
+
+def get_export_job(job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Export job owned by this user, or None"""
+    job = export_jobs.get(job_id)
+    if job is None or job["user_id"] != str(user_id):
+        return None
+    return job
+
+
+async def enqueue_export_job(
+    user_id: str,
+    filename: str,
+    media_type: str,
+    builder: Callable[[str], Any]
+) -> str:
+    """
+    Queue a file export for the export worker
+    
+    Args:
+        user_id: Owner of the export; only they can fetch it
+        filename: Download filename
+        media_type: Content type of the finished file
+        builder: Blocking callable writing the file to the path it is given;
+            raising LookupError means there was nothing to export
+    
+    Returns:
+        Job id to poll
+    """
+    _prune_export_jobs()
+    
+    job_id = uuid.uuid4().hex
+    export_jobs[job_id] = {
+        "user_id": str(user_id),
+        "status": "pending",
+        "filename": filename,
+        "media_type": media_type,
+        "path": None,
+        "error": None,
+        "created_at": time.monotonic()
+    }
+    await export_queue.put(("export", (job_id, builder)))
+    return job_id
+
+
+async def process_export_async(job_id: str, builder: Callable[[str], Any]):
+    """Build an export file in background"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return
+    
+    job["status"] = "running"
+    fd, path = tempfile.mkstemp(prefix=f"export_{job_id}_", suffix=os.path.splitext(job["filename"])[1])
+    os.close(fd)
+    
+    try:
+        logger.info(f"Starting export {job_id} for user {job['user_id']}: {job['filename']}")
+        
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(thread_pool, builder, path)
+        
+        job["path"] = path
+        job["status"] = "done"
+        logger.info(f"✅ Export {job_id} ready for user {job['user_id']}")
+    except LookupError as e:
+        os.remove(path)
+        job["status"] = "no_data"
+        job["error"] = str(e)
     except Exception as e:
-        logger.error(f"💥 Exception in Acceptance file processing for user {user_id}: {str(e)}")
\ No newline at end of file
+        os.remove(path)
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.error(f"💥 Exception in export {job_id} for user {job['user_id']}: {str(e)}")
@@ -0,0 +1,27 @@
+# app/upload_process.py
+"""
+Initializer of the upload worker processes
+
+Kept apart from app.tasks on purpose: unpickling the initializer in a
+freshly spawned process imports only this module, so the pool settings it
+exports are in place before app.config and app.database build the engines.
+That holds only while the entry point does not import app.main at module
+level: spawn re-runs the parent's __main__ script in every worker first, and
+an app import there builds full-size engines before this initializer runs.
+"""
+import logging
+import os
+
+
+def init_upload_process(pool_size: int) -> None:
+    """Log like the API process does and cap this process' connection pool"""
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    # The async engine is never used in upload processes
+    os.environ["DB_ASYNC_POOL_SIZE"] = "1"
+    os.environ["DB_ASYNC_MAX_OVERFLOW"] = "0"
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
@@ -140,4 +140,76 @@ def get_period_filter(period_type: str, year=None, month=None, week=None):
     # If no conditions, return "1=1" (always true, no filtering)
     where_clause = " AND ".join(conditions) if conditions else "1=1"
     
-    return where_clause, params
\ No newline at end of file
+    return where_clause, params
+
+
+def get_summary_view_aggregations():
+    """
+    Roll up rows of a summary materialized view into one row per group.
+    
+    The views already hold the aggregates above per (project, period), so
+    counts and amounts are summed again. unique_pos adds up because each PO
+    line has a single publish_date and so lands in exactly one view row.
+    Returns SQL fragment for SELECT clause.
+    """
+    return """
+        SUM(total_records)::bigint as total_records,
+        SUM(unique_pos)::bigint as unique_pos,
+        SUM(total_line_amount) as total_line_amount,
+        SUM(total_ac_amount) as total_ac_amount,
+        SUM(total_pac_amount) as total_pac_amount,
+        SUM(total_remaining_amount) as total_remaining_amount,
+        SUM(closed_count)::bigint as closed_count,
+        SUM(cancelled_count)::bigint as cancelled_count,
+        SUM(pending_count)::bigint as pending_count,
+        SUM(acpac_100_count)::bigint as acpac_100_count,
+        SUM(ac_pac_split_count)::bigint as ac_pac_split_count,
+        SUM(survey_count)::bigint as survey_count,
+        SUM(transportation_count)::bigint as transportation_count,
+        SUM(site_engineer_count)::bigint as site_engineer_count,
+        SUM(service_count)::bigint as service_count,
+        MIN(earliest_date) as earliest_date,
+        MAX(latest_date) as latest_date
+    """
+
+
+def get_summary_view_filter(period_type: str, year=None, month=None, week=None, period_start=None, period_end=None):
+    """
+    Same filters as get_period_filter, on the columns of a summary view.
+    
+    The year filter applies to the calendar year of publish_date. Weekly
+    groups are keyed by the year of the week start instead, so the weekly
+    view keeps publish_year as an extra column for it.
+    
+    Returns:
+        Tuple of (where_clause, params_dict)
+    """
+    conditions = []
+    params = {}
+    
+    if year:
+        year_column = "publish_year" if period_type == "weekly" else "year"
+        conditions.append(f"{year_column} = :year")
+        params["year"] = year
+    
+    if month and period_type == "monthly":
+        conditions.append("month = :month")
+        params["month"] = month
+    
+    if week and period_type == "weekly":
+        conditions.append("week_number = :week")
+        params["week"] = week
+    
+    # Date window on the week start (only for weekly summaries); unlike a
+    # week number range it carries on across New Year
+    if period_start and period_type == "weekly":
+        conditions.append("period_date >= :period_start")
+        params["period_start"] = period_start
+    
+    if period_end and period_type == "weekly":
+        conditions.append("period_date <= :period_end")
+        params["period_end"] = period_end
+    
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    
+    return where_clause, params
@@ -0,0 +1,40 @@
+# app/utils/fast_json.py
+"""
+orjson-based JSON encoding for the large read responses
+
+Payloads are dumped by orjson directly instead of being walked by
+jsonable_encoder first. Types orjson does not know are handled by
+_default with the same conversions FastAPI would apply (Decimal via
+decimal_encoder, ORM objects via jsonable_encoder).
+"""
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Mapping):
+        # SQLAlchemy RowMapping
+        return dict(value)
+    return jsonable_encoder(value)
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a payload to compact UTF-8 JSON"""
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; return it directly to skip jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
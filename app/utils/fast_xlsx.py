@@ -0,0 +1,256 @@
+# app/utils/fast_xlsx.py
+"""
+Minimal single-sheet xlsx writer for large, unstyled tabular exports
+
+Rows are serialized straight to worksheet XML and streamed into the zip,
+skipping the per-cell objects openpyxl creates even in write-only mode.
+Strings are written inline (no shared-string table) and dates use a
+single 'yyyy-mm-dd' cell style. Columns listed in date_columns take
+pre-computed Excel serial day numbers (e.g. computed in SQL) instead of
+date objects.
+
+iter_xlsx() produces the file as a stream of bytes chunks, one per batch
+of rows, so a response can start before the last row has been fetched.
+"""
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, BinaryIO, Iterable, Iterator, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+_EXCEL_EPOCH = date(1899, 12, 30)
+_EXCEL_EPOCH_DT = datetime(1899, 12, 30)
+
+# Control characters that are not allowed in XML 1.0
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+# Style 0 is the default, style 1 formats serial numbers as dates
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+def _column_letter(index: int) -> str:
+    """0-based column index -> Excel column letters (0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref: str, value: Any) -> str:
+    """Serialize one cell; None produces no cell at all"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, Decimal)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), float("-inf")):
+            return ""
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value.replace(tzinfo=None) - _EXCEL_EPOCH_DT).total_seconds() / 86400
+        return f'<c r="{ref}" s="1"><v>{serial!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="1"><v>{(value - _EXCEL_EPOCH).days}</v></c>'
+
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _serial_date_cell_xml(ref: str, value: Any) -> str:
+    """Serialize an Excel serial day number with the date style (headers etc. fall through)"""
+    if type(value) is not int:
+        return _cell_xml(ref, value)
+    return f'<c r="{ref}" s="1"><v>{value}</v></c>'
+
+
+class FastXlsxWriter:
+    """
+    Stream rows into a single-sheet xlsx file
+
+    Usage:
+        with FastXlsxWriter(output, "Sheet", date_columns=(3,)) as writer:
+            writer.write_row(header)
+            writer.write_rows(rows)
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        sheet_name: str = "Sheet1",
+        date_columns: Iterable[int] = ()
+    ):
+        self._zip = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        self._zip.writestr(
+            "xl/workbook.xml",
+            _WORKBOOK.format(sheet_name=escape(sheet_name[:31], {'"': "&quot;"}))
+        )
+        self._zip.writestr("xl/styles.xml", _STYLES)
+
+        # The sheet must be the last member written: zipfile allows only one open stream
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write(_SHEET_HEADER.encode("utf-8"))
+        self._row_num = 0
+        self._date_columns = frozenset(date_columns)
+        self._column_refs: list = []
+        self._serializers: list = []
+
+    def _columns(self, width: int) -> Tuple[list, list]:
+        while len(self._column_refs) < width:
+            index = len(self._column_refs)
+            self._column_refs.append(_column_letter(index))
+            self._serializers.append(
+                _serial_date_cell_xml if index in self._date_columns else _cell_xml
+            )
+        return self._column_refs, self._serializers
+
+    def _row_xml(self, values: Sequence[Any]) -> str:
+        self._row_num += 1
+        row_num = self._row_num
+        refs, serializers = self._columns(len(values))
+        cells = "".join(
+            serializers[i](f"{refs[i]}{row_num}", value) for i, value in enumerate(values)
+        )
+        return f'<row r="{row_num}">{cells}</row>'
+
+    @property
+    def rows_written(self) -> int:
+        return self._row_num
+
+    def write_row(self, values: Sequence[Any]) -> None:
+        """Append one row"""
+        self._sheet.write(self._row_xml(values).encode("utf-8"))
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Append a batch of rows with a single write to the zip stream"""
+        self._sheet.write("".join(self._row_xml(values) for values in rows).encode("utf-8"))
+
+    def close(self) -> None:
+        """Finish the worksheet and the zip central directory"""
+        if self._sheet is not None:
+            self._sheet.write(_SHEET_FOOTER.encode("utf-8"))
+            self._sheet.close()
+            self._sheet = None
+            self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only, non-seekable sink that hands back what was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_xlsx(
+    row_batches: Iterable[Iterable[Sequence[Any]]],
+    header: Sequence[Any],
+    sheet_name: str = "Sheet1",
+    date_columns: Iterable[int] = ()
+) -> Iterator[bytes]:
+    """
+    Generate an xlsx file chunk by chunk
+
+    Args:
+        row_batches: Batches of rows (e.g. cursor partitions); one chunk is yielded per batch
+        header: First row of the sheet
+        sheet_name: Worksheet name
+        date_columns: Columns holding Excel serial day numbers
+
+    Yields:
+        Compressed zip bytes, in order
+    """
+    # zipfile falls back to data descriptors when the target cannot seek
+    sink = _StreamSink()
+    with FastXlsxWriter(sink, sheet_name, date_columns=date_columns) as writer:
+        writer.write_row(header)
+        for rows in row_batches:
+            writer.write_rows(rows)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    yield sink.drain()
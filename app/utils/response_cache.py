@@ -0,0 +1,142 @@
+# app/utils/response_cache.py
+"""
+In-process response cache for idempotent per-user GET endpoints
+
+Cached bodies are keyed on (path, query string, user_id, data version).
+The data version is bumped whenever a user's data changes (upload
+finished, account edited), so stale entries stop matching immediately
+instead of waiting for the TTL to expire.
+"""
+import hashlib
+import inspect
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.utils.fast_json import dumps
+
+DEFAULT_TTL_SECONDS = 30
+MAX_ENTRIES = 1024
+
+# Distinguishes ETags issued by this process from ones issued before a restart
+_BOOT_ID = uuid.uuid4().hex
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        """Store a value for ttl seconds, evicting the oldest entry if full"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+_response_cache = TTLCache()
+_data_versions: dict = {}
+_versions_lock = threading.Lock()
+
+
+def get_data_version(user_id: str) -> int:
+    """Current data version for a user (0 until the first change)"""
+    return _data_versions.get(str(user_id), 0)
+
+
+def bump_data_version(user_id: str) -> None:
+    """Invalidate every cached response for a user"""
+    with _versions_lock:
+        key = str(user_id)
+        _data_versions[key] = _data_versions.get(key, 0) + 1
+
+
+def data_etag(request: Request, user_id: str, variant: str = "") -> str:
+    """
+    ETag for a user's view of an endpoint, known before any query runs
+
+    It only changes when the URL, the user's data version or variant does,
+    so a matching If-None-Match can be answered without touching the
+    database. variant carries inputs the URL doesn't show, such as a
+    default date window derived from today.
+    """
+    raw = (
+        f"{_BOOT_ID}:{request.url.path}?{request.query_params}:{user_id}:"
+        f"{get_data_version(user_id)}:{variant}"
+    )
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+async def cached_json_response(
+    request: Request,
+    user_id: str,
+    builder: Callable[[], Any],
+    ttl: int = DEFAULT_TTL_SECONDS
+) -> Response:
+    """
+    Serve a JSON payload from the cache, honouring If-None-Match
+
+    Args:
+        request: Incoming request (path, query string and headers are used)
+        user_id: Owner of the data; part of the cache key
+        builder: Zero-argument callable producing the payload (or an awaitable of it) on a miss
+        ttl: Seconds a cached body stays valid
+
+    Returns:
+        304 if the client's ETag still matches, otherwise a 200 JSON response
+    """
+    key = (
+        request.url.path,
+        str(request.query_params),
+        str(user_id),
+        get_data_version(user_id)
+    )
+
+    entry = _response_cache.get(key)
+    if entry is None:
+        payload = builder()
+        if inspect.isawaitable(payload):
+            payload = await payload
+        body = dumps(payload)
+        etag = '"' + hashlib.sha1(_BOOT_ID.encode() + body).hexdigest() + '"'
+        entry = (etag, body)
+        _response_cache.set(key, entry, ttl)
+
+    etag, body = entry
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={ttl}"
+    }
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)